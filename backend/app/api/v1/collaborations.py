@@ -1,5 +1,5 @@
 """Collaboration endpoints"""
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, and_, or_
 from typing import List, Optional
@@ -7,18 +7,33 @@ from datetime import datetime
 
 from app.models.collaboration import Application, Collaboration, ApplicationStatus, CollaborationStatus
 from app.models.offer import Offer
-from app.models import User
+from app.models import User, Profile
 from app.schemas.collaboration import (
     ApplicationCreate, ApplicationOut, ApplicationMeOut, ApplicationReview,
-    CollaborationSchedule, CollaborationRate, CollaborationOut, CollaborationDetailOut
+    CollaborationSchedule, CollaborationRate, CollaborationDetailOut,
+    ApplicationReviewBatch, ApplicationReviewBatchOut, ApplicantOut, CreatorSummaryOut,
+    CollaborationListOut
 )
 from app.database import get_db
 from app.utils.dependencies import get_current_user
+from app.utils.projection import schema_columns
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_order, keyset_condition
 from app.services.collaboration_service import CollaborationService
 from app.services.notification_service import NotificationService
+from app.services.eligibility_service import profile_followers
+from app.services.tier_service import TierService
+from app.services.reputation_service import ReputationService
+from app.services.trending_service import TrendingService, WEIGHT_APPLICATION
+from app.services.analytics_service import AnalyticsService
+from app.models.analytics import OfferEventType
+from app.config import settings
 
 router = APIRouter(prefix="/api/v1", tags=["collaborations"])
 
+# Bandeja de aplicaciones: la aplicación y el resumen del creador en una fila
+APPLICANT_COLUMNS = schema_columns(Application, ApplicantOut)
+CREATOR_SUMMARY_COLUMNS = schema_columns(Profile, CreatorSummaryOut)
+
 # ============ APLICACIONES ============
 
 @router.post("/applications", response_model=ApplicationOut, status_code=201)
@@ -34,32 +49,29 @@ async def apply_to_offer(
             detail="Solo creators pueden aplicar"
         )
     
-    offer = await db.get(Offer, app_data.offer_id)
-    if not offer:
-        raise HTTPException(status_code=404, detail="Oferta no encontrada")
-    
-    existing = await db.scalar(
-        select(Application).where(
-            and_(
-                Application.offer_id == app_data.offer_id,
-                Application.creator_id == current_user.id
-            )
-        )
+    application = await CollaborationService.create_application(
+        db, app_data, current_user.id
     )
     
-    if existing:
+    if application is None:
+        refusal = await CollaborationService.application_refusal(db, app_data.offer_id, current_user.id)
+        if refusal == "not_found":
+            raise HTTPException(status_code=404, detail="Oferta no encontrada")
+        if refusal == "duplicate":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Ya has aplicado a esta oferta"
+            )
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Ya has aplicado a esta oferta"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La oferta no está activa o su plazo de aplicación ha vencido"
         )
     
-    application = await CollaborationService.create_application(
-        db, app_data, current_user.id
-    )
-    
     await NotificationService.notify_new_application(
-        db, offer.business_id, application.id
+        db, application.business_id, application.id
     )
+    TrendingService.record(application.offer_id, WEIGHT_APPLICATION)
+    AnalyticsService.record(OfferEventType.APPLY, [application.offer_id])
     
     return application
 
@@ -123,13 +135,65 @@ async def review_application(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Revisar aplicación"""
-    application = await db.get(Application, app_id)
-    
-    if not application:
+    """
+    Revisar aplicación
+
+    Todo el cambio (estado, contador, colaboración y notificación) se
+    confirma en una sola transacción, ver CollaborationService.review_application.
+    """
+    row = (await db.execute(
+        select(Application, Offer.business_id, Offer.budget_min)
+        .join(Offer, Offer.id == Application.offer_id)
+        .where(Application.id == app_id)
+        .with_for_update(of=Application)
+    )).first()
+    
+    if not row:
         raise HTTPException(status_code=404, detail="Aplicación no encontrada")
     
-    offer = await db.get(Offer, application.offer_id)
+    application, business_id, budget_min = row
+    
+    if business_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No autorizado"
+        )
+    
+    accepted = await CollaborationService.review_application(
+        db, application, business_id, budget_min, review
+    )
+    if accepted:
+        AnalyticsService.record(OfferEventType.ACCEPT, [application.offer_id])
+    
+    return {"message": f"Aplicación {review.status.value}"}
+
+
+@router.post("/offers/{offer_id}/applications/review-batch", response_model=ApplicationReviewBatchOut)
+async def review_applications_batch(
+    offer_id: int,
+    batch: ApplicationReviewBatch,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Revisar en lote aplicaciones de una oferta
+
+    Cada decisión acepta o rechaza (otro estado es un 422). Todas las decisiones se aplican en una transacción. Las que no se
+    pueden aplicar (aplicación de otra oferta, repetida) se informan en
+    `errors` sin impedir el resto.
+    """
+    if len(batch.decisions) > settings.REVIEW_BATCH_MAX_DECISIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {settings.REVIEW_BATCH_MAX_DECISIONS} decisiones por lote"
+        )
+    
+    offer = (await db.execute(
+        select(Offer.business_id, Offer.budget_min).where(Offer.id == offer_id)
+    )).first()
+    
+    if not offer:
+        raise HTTPException(status_code=404, detail="Oferta no encontrada")
     
     if offer.business_id != current_user.id:
         raise HTTPException(
@@ -137,64 +201,134 @@ async def review_application(
             detail="No autorizado"
         )
     
-    application.status = review.status
-    application.reviewed_at = datetime.utcnow()
-    application.responded_at = datetime.utcnow()
+    result = await CollaborationService.review_applications(
+        db, offer_id, offer.business_id, offer.budget_min, batch.decisions
+    )
+    AnalyticsService.record(OfferEventType.ACCEPT, [offer_id] * result["accepted"])
     
-    if review.status == ApplicationStatus.REJECTED:
-        application.rejection_reason = review.rejection_reason
-        await db.commit()
-        
-        await NotificationService.notify_application_rejected(
-            db, application.creator_id, application.id
+    return result
+
+
+@router.get("/offers/{offer_id}/applications", response_model=List[ApplicantOut])
+async def get_offer_applications(
+    offer_id: int,
+    response: Response,
+    status_filter: Optional[ApplicationStatus] = Query(None, alias="status"),
+    min_followers: Optional[int] = Query(None, ge=0),
+    max_followers: Optional[int] = Query(None, ge=0),
+    tier: Optional[int] = Query(None, ge=0, le=5),
+    country: Optional[str] = Query(None, min_length=2, max_length=2),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de X-Next-Cursor"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Aplicaciones recibidas por una oferta (business), de la más reciente a la más antigua
+
+    Cada aplicación incluye el resumen del perfil del creador, obtenido en la
+    misma consulta (JOIN con profiles). Los seguidores se comparan con la
+    mayor audiencia del creador entre Instagram y TikTok. Paginación por
+    cursor con la cabecera `X-Next-Cursor`.
+    """
+    business_id = await db.scalar(select(Offer.business_id).where(Offer.id == offer_id))
+    
+    if business_id is None:
+        raise HTTPException(status_code=404, detail="Oferta no encontrada")
+    
+    if business_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No autorizado"
         )
     
-    elif review.status == ApplicationStatus.ACCEPTED:
-        await db.commit()
-        
-        collaboration = await CollaborationService.create_collaboration(
-            db,
-            offer.id,
-            application.id,
-            application.creator_id,
-            offer.business_id,
-            application.proposed_fee or offer.budget_min
+    query = (
+        select(
+            *APPLICANT_COLUMNS,
+            *(column.label(f"creator_{column.key}") for column in CREATOR_SUMMARY_COLUMNS)
         )
-        
-        await NotificationService.notify_application_accepted(
-            db, application.creator_id, application.id
+        .outerjoin(Profile, Profile.user_id == Application.creator_id)
+        .where(Application.offer_id == offer_id)
+        .order_by(*keyset_order(Application.applied_at, Application.id))
+    )
+    
+    if status_filter:
+        query = query.where(Application.status == status_filter)
+    
+    if min_followers is not None:
+        query = query.where(profile_followers() >= min_followers)
+    
+    if max_followers is not None:
+        query = query.where(profile_followers() <= max_followers)
+    
+    if tier is not None:
+        query = query.where(Profile.tier_level == tier)
+    
+    if country:
+        query = query.where(Profile.country == country.upper())
+    
+    if cursor:
+        position = decode_cursor(cursor, datetime)
+        query = query.where(
+            keyset_condition(Application.applied_at, position["k"], Application.id, position["id"])
         )
     
-    return {"message": f"Aplicación {review.status.value}"}
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor({"k": last.applied_at, "id": last.id})
+    
+    applicants = []
+    for row in rows:
+        values = row._mapping
+        creator = None
+        if values["creator_user_id"] is not None:
+            creator = {column.key: values[f"creator_{column.key}"] for column in CREATOR_SUMMARY_COLUMNS}
+        applicants.append({
+            **{column.key: values[column.key] for column in APPLICANT_COLUMNS},
+            "creator": creator,
+        })
+    return applicants
 
 
 # ============ COLABORACIONES ============
 
-@router.get("/collaborations", response_model=List[CollaborationOut])
+@router.get("/collaborations", response_model=List[CollaborationListOut])
 async def get_collaborations(
+    response: Response,
     status_filter: Optional[CollaborationStatus] = Query(None, alias="status"),
     role: str = Query("all", regex="^(creator|business|all)$"),
+    include_offer: bool = Query(False, description="Incluir el resumen de la oferta"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de X-Next-Cursor"),
+    limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Mis colaboraciones"""
-    filters = []
-    
-    if role == "creator" or role == "all":
-        filters.append(Collaboration.creator_id == current_user.id)
-    
-    if role == "business" or role == "all":
-        filters.append(Collaboration.business_id == current_user.id)
-    
-    query = select(Collaboration).where(or_(*filters) if len(filters) > 1 else filters[0])
-    
-    if status_filter:
-        query = query.where(Collaboration.status == status_filter)
+    """
+    Mis colaboraciones, de la más reciente a la más antigua
+
+    Paginación por cursor con la cabecera `X-Next-Cursor`. Con
+    `include_offer=true` cada colaboración trae el resumen de su oferta
+    (una consulta adicional para toda la página, no una por colaboración).
+    """
+    position = None
+    if cursor:
+        position = decode_cursor(cursor, datetime)
+    
+    query = CollaborationService.collaborations_query(
+        current_user.id, role, limit + 1, status_filter, position, include_offer
+    )
+    result = await db.execute(query)
+    collaborations = result.scalars().all() if include_offer else result.all()
     
-    query = query.order_by(desc(Collaboration.created_at))
+    if len(collaborations) > limit:
+        collaborations = collaborations[:limit]
+        last = collaborations[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor({"k": last.created_at, "id": last.id})
     
-    result = await db.execute(query)
-    return result.scalars().all()
+    return collaborations
 
 
 @router.get("/collaborations/{collab_id}", response_model=CollaborationDetailOut)
@@ -262,7 +396,10 @@ async def rate_collaboration(
     db: AsyncSession = Depends(get_db)
 ):
     """Calificar colaboración"""
-    collaboration = await db.get(Collaboration, collab_id)
+    # Bloqueada: si ambas partes califican a la vez, sólo una la completa
+    collaboration = await db.scalar(
+        select(Collaboration).where(Collaboration.id == collab_id).with_for_update()
+    )
     
     if not collaboration:
         raise HTTPException(status_code=404, detail="Colaboración no encontrada")
@@ -274,19 +411,29 @@ async def rate_collaboration(
             detail="No autorizado"
         )
     
+    # Cada parte califica a la otra: su rating acumulado se ajusta en la misma transacción
     if current_user.id == collaboration.creator_id:
+        rated_user_id, previous = collaboration.business_id, collaboration.creator_rating
         collaboration.creator_rating = rating.rating
         collaboration.creator_feedback = rating.feedback
     else:
+        rated_user_id, previous = collaboration.creator_id, collaboration.business_rating
         collaboration.business_rating = rating.rating
         collaboration.business_feedback = rating.feedback
+    await ReputationService.record_rating(db, rated_user_id, rating.rating, previous)
     
     if (collaboration.creator_rating is not None and 
-        collaboration.business_rating is not None):
+        collaboration.business_rating is not None and
+        collaboration.status != CollaborationStatus.COMPLETED):
         collaboration.status = CollaborationStatus.COMPLETED
         collaboration.completed_date = datetime.utcnow()
         
-        await CollaborationService.update_creator_tier(db, collaboration.creator_id)
+        await ReputationService.record_finished(db, [collaboration.creator_id, collaboration.business_id])
+        tiers = await TierService.record_completion(db, collaboration.creator_id)
+        if tiers and tiers[1] > tiers[0]:
+            await NotificationService.notify_tier_upgraded(
+                db, collaboration.creator_id, tiers[1], commit=False
+            )
     
     await db.commit()
     
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.config import settings
+from app.services.feed_cache_service import FeedCacheService
 
 router = APIRouter(prefix="/api/v1", tags=["info"])
 
@@ -21,3 +22,9 @@ async def get_info():
         "version": settings.VERSION,
         "api_version": "v1"
     }
+
+
+@router.get("/metrics/feed-cache")
+async def get_feed_cache_metrics():
+    """Métricas de la cache del feed (por worker)"""
+    return FeedCacheService.get_stats()
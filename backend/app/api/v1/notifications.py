@@ -10,9 +10,13 @@ from app.models import User
 from app.schemas.notification import NotificationOut
 from app.database import get_db
 from app.utils.dependencies import get_current_user
+from app.utils.projection import schema_columns
 
 router = APIRouter(prefix="/api/v1/notifications", tags=["notifications"])
 
+# Columnas que necesita NotificationOut (sin el JSON `data` ni las FKs)
+NOTIFICATION_LIST_COLUMNS = schema_columns(Notification, NotificationOut)
+
 @router.get("/", response_model=List[NotificationOut])
 async def get_notifications(
     current_user: User = Depends(get_current_user),
@@ -20,11 +24,11 @@ async def get_notifications(
 ):
     """Obtener notificaciones del usuario"""
     result = await db.execute(
-        select(Notification)
+        select(*NOTIFICATION_LIST_COLUMNS)
         .where(Notification.user_id == current_user.id)
         .order_by(desc(Notification.created_at))
     )
-    return result.scalars().all()
+    return result.all()
 
 
 @router.patch("/{notification_id}/read")
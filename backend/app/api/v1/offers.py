@@ -1,19 +1,47 @@
 """Offer endpoints"""
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, and_, or_, func
 from typing import List, Optional
 from datetime import datetime
 
 from app.models.offer import Offer, OfferStatus
-from app.models import User
-from app.schemas.offer import OfferCreate, OfferUpdate, OfferOut, OfferDetailOut
+from app.models import User, Profile
+from app.schemas.offer import (
+    OfferCreate, OfferUpdate, OfferOut, OfferDetailOut, EligibleCreatorOut,
+    OfferFacetsOut, NearbyOfferOut, BulkOfferResultOut, OfferAnalyticsOut, MyOfferOut
+)
 from app.database import get_db
 from app.utils.dependencies import get_current_user
-from app.services.offer_service import OfferService
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_order, keyset_condition, NUMBER
+from app.utils.http_cache import etag_matches, set_etag, not_modified
+from app.utils.projection import schema_columns
+from app.utils.json_stream import iter_json_values
+from app.services.offer_service import OfferService, active_offer_filter
+from app.services.view_counter_service import ViewCounterService
+from app.services.feed_cache_service import FeedCacheService
+from app.services.trending_service import TrendingService, WEIGHT_PUBLISH
+from app.services.eligibility_service import EligibilityService, profile_followers
+from app.services.geo_service import GeoService
+from app.services.analytics_service import AnalyticsService
+from app.services.ranking_service import RankingService
+from app.models.analytics import OfferEventType
+from app.config import settings
 
 router = APIRouter(prefix="/api/v1/offers", tags=["offers"])
 
+# sort_by -> (clave de orden, descendente, admite NULL)
+FEED_SORT_KEYS = {
+    "recent": (Offer.published_at, True, True, datetime),
+    "trending": (Offer.trending_score, True, True, NUMBER),
+    "deadline": (Offer.application_deadline, False, False, datetime),
+    "payment": (Offer.payout_base, True, True, NUMBER),
+}
+
+# Columnas que necesita OfferOut (sin requirements, req_*, search_vector, ...)
+OFFER_LIST_COLUMNS = schema_columns(Offer, OfferOut)
+
+
 @router.post("/", response_model=OfferOut, status_code=201)
 async def create_offer(
     offer_data: OfferCreate,
@@ -31,88 +59,430 @@ async def create_offer(
     return offer
 
 
+@router.post("/bulk", response_model=BulkOfferResultOut)
+async def bulk_create_offers(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Importar ofertas en borrador de forma masiva
+
+    El cuerpo es un array JSON de OfferCreate o NDJSON (una oferta por
+    línea, `Content-Type: application/x-ndjson`). Se procesa a medida que
+    llega; los elementos inválidos se informan en `errors` por su índice y
+    no impiden crear el resto.
+    """
+    if current_user.user_type.value not in ["business", "agency"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo business y agency pueden crear ofertas"
+        )
+    
+    return await OfferService.bulk_create_offers(
+        db, iter_json_values(request.stream()), current_user.id
+    )
+
+
 @router.get("/", response_model=List[OfferOut])
 async def list_offers(
+    response: Response,
     category: Optional[str] = Query(None),
-    platforms: Optional[str] = Query(None),
+    platforms: Optional[str] = Query(None, description="Lista separada por comas: instagram,tiktok"),
+    platforms_match: str = Query("any", regex="^(any|all)$", description="any: alguna plataforma, all: todas"),
     budget_min: Optional[float] = Query(None),
     budget_max: Optional[float] = Query(None),
     search: Optional[str] = Query(None),
-    sort_by: str = Query("recent", regex="^(recent|trending|deadline|payment)$"),
+    sort_by: Optional[str] = Query(None, regex="^(relevance|recent|trending|deadline|payment|for_you)$"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de X-Next-Cursor (reemplaza a page)"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
-    """Listar ofertas activas"""
-    query = select(Offer).where(
-        and_(
-            Offer.status == OfferStatus.ACTIVE,
-            Offer.is_public == True,
-            Offer.application_deadline > datetime.utcnow()
+    """
+    Listar ofertas activas
+
+    Paginación por cursor: si hay más resultados se devuelve la cabecera
+    `X-Next-Cursor`, que se envía como `cursor` para pedir la página siguiente.
+    `page` se mantiene como paginación legacy por offset.
+    
+    `sort_by=for_you` (sólo creadores) ordena por afinidad con el perfil y
+    el historial de aplicaciones del creador, ver RankingService.
+    """
+    category = OfferService.parse_category(category) if category else None
+    platform_list = OfferService.parse_platforms(platforms) if platforms else []
+    ts_query = OfferService.build_search_query(search) if search else None
+    
+    if sort_by == "for_you":
+        if not current_user or current_user.user_type.value != "creator":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="sort_by=for_you solo está disponible para creadores"
+            )
+        if ts_query is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="sort_by=for_you no admite search"
+            )
+        
+        offset = (page - 1) * limit
+        if cursor:
+            position = decode_cursor(cursor, int, s=sort_by)
+            if position["k"] < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor inválido"
+                )
+            offset = position["k"]
+        
+        ids, has_more = await RankingService.rank(
+            db, current_user.id, offset, limit,
+            category=category, platforms=platform_list, platforms_match=platforms_match,
+            budget_min=budget_min, budget_max=budget_max
         )
+        
+        # La matriz es una foto de hace segundos: se vuelve a comprobar que sigan activas
+        offers = []
+        if ids:
+            result = await db.execute(
+                select(*OFFER_LIST_COLUMNS).where(Offer.id.in_(ids), active_offer_filter())
+            )
+            by_id = {offer.id: offer for offer in result.all()}
+            offers = [by_id[offer_id] for offer_id in ids if offer_id in by_id]
+        
+        if has_more:
+            response.headers["X-Next-Cursor"] = encode_cursor({"s": sort_by, "k": offset + limit, "id": ids[-1]})
+        
+        ViewCounterService.record_views(offer.id for offer in offers)
+        AnalyticsService.record(OfferEventType.IMPRESSION, (offer.id for offer in offers))
+        return offers
+    filters = OfferService.list_filters(category, platform_list, platforms_match, budget_min, budget_max, ts_query)
+    
+    query = select(*OFFER_LIST_COLUMNS).where(active_offer_filter(), *filters.values())
+    
+    if ts_query is not None:
+        rank = func.ts_rank(Offer.search_vector, ts_query)
+        query = query.add_columns(OfferService.search_headline(ts_query).label("highlight"))
+    
+    if sort_by is None:
+        sort_by = "relevance" if ts_query is not None else "recent"
+    
+    if sort_by == "relevance":
+        if ts_query is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="sort_by=relevance requiere search"
+            )
+        sort_col, descending, nullable, key_type = rank, True, False, NUMBER
+    else:
+        sort_col, descending, nullable, key_type = FEED_SORT_KEYS[sort_by]
+    query = query.add_columns(sort_col.label("sort_key")).order_by(
+        *keyset_order(sort_col, Offer.id, descending)
     )
     
-    if category:
-        query = query.where(Offer.category == category)
+    if cursor:
+        position = decode_cursor(cursor, key_type, nullable, s=sort_by)
+        query = query.where(
+            keyset_condition(sort_col, position.get("k"), Offer.id, position["id"], descending, nullable)
+        )
+    else:
+        query = query.offset((page - 1) * limit)
+    
+    async def fetch_page():
+        result = await db.execute(query.limit(limit + 1))
+        offers = result.all()
+        
+        next_cursor = None
+        if len(offers) > limit:
+            offers = offers[:limit]
+            last = offers[-1]
+            next_cursor = encode_cursor({"s": sort_by, "k": last.sort_key, "id": last.id})
+        return offers, next_cursor
+    
+    # Las primeras páginas del feed anónimo sin búsqueda son iguales para todos
+    if (settings.FEED_CACHE_ENABLED and current_user is None and ts_query is None
+            and not cursor and page <= settings.FEED_CACHE_MAX_PAGE):
+        cache_params = {
+            "category": category,
+            "platforms": platform_list,
+            "platforms_match": platforms_match if platform_list else None,
+            "budget_min": budget_min,
+            "budget_max": budget_max,
+            "sort_by": sort_by,
+            "page": page,
+            "limit": limit,
+        }
+        
+        async def compute():
+            return FeedCacheService.build_entry(*await fetch_page())
+        
+        entry, cache_status = await FeedCacheService.get_or_compute(category, cache_params, compute)
+        ViewCounterService.record_views(entry["ids"])
+        AnalyticsService.record(OfferEventType.IMPRESSION, entry["ids"])
+        return FeedCacheService.to_response(entry, cache_status)
     
-    if budget_min:
-        query = query.where(Offer.budget_min >= budget_min)
+    offers, next_cursor = await fetch_page()
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
-    if budget_max:
-        query = query.where(Offer.budget_max <= budget_max)
+    ViewCounterService.record_views(offer.id for offer in offers)
+    AnalyticsService.record(OfferEventType.IMPRESSION, (offer.id for offer in offers))
     
-    if search:
-        search_term = f"%{search}%"
+    return offers
+
+
+@router.get("/facets", response_model=OfferFacetsOut)
+async def offer_facets(
+    category: Optional[str] = Query(None),
+    platforms: Optional[str] = Query(None, description="Lista separada por comas: instagram,tiktok"),
+    platforms_match: str = Query("any", regex="^(any|all)$"),
+    budget_min: Optional[float] = Query(None),
+    budget_max: Optional[float] = Query(None),
+    search: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Contadores por categoría, plataforma y rango de presupuesto
+
+    Acepta los mismos filtros que el listado. Cada faceta cuenta con el resto
+    de filtros aplicados pero no el suyo. El resultado se cachea unos segundos
+    por combinación de filtros.
+    """
+    category = OfferService.parse_category(category) if category else None
+    platform_list = OfferService.parse_platforms(platforms) if platforms else []
+    ts_query = OfferService.build_search_query(search) if search else None
+    filters = OfferService.list_filters(category, platform_list, platforms_match, budget_min, budget_max, ts_query)
+    
+    async def compute():
+        facets = await OfferService.get_facets(db, active_offer_filter(), filters)
+        return {
+            "body": OfferFacetsOut(**facets).model_dump_json().encode("utf-8"),
+            "ids": [],
+            "cursor": None,
+            "ttl": settings.OFFER_FACETS_CACHE_TTL_SECONDS,
+        }
+    
+    if not settings.FEED_CACHE_ENABLED:
+        return FeedCacheService.to_response(await compute(), "BYPASS")
+    
+    cache_params = {
+        "facets": True,
+        "category": category,
+        "platforms": platform_list,
+        "platforms_match": platforms_match if platform_list else None,
+        "budget_min": budget_min,
+        "budget_max": budget_max,
+        "search": " ".join(search.lower().split()) if ts_query is not None else None,
+    }
+    # Sin ámbito de categoría: las facetas cuentan todas las categorías
+    entry, cache_status = await FeedCacheService.get_or_compute(None, cache_params, compute)
+    return FeedCacheService.to_response(entry, cache_status)
+
+
+@router.get("/nearby", response_model=List[NearbyOfferOut])
+async def nearby_offers(
+    response: Response,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=100),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """
+    Ofertas activas a menos de `radius_km`, de la más cercana a la más lejana
+
+    Sin `latitude` / `longitude` se usa la ubicación del perfil del usuario.
+    """
+    latitude, longitude = await GeoService.resolve_point(db, current_user, latitude, longitude)
+    point = [latitude, longitude, radius_km]
+    
+    distance = GeoService.offer_distance(latitude, longitude)
+    query = (
+        select(*OFFER_LIST_COLUMNS, distance.label("distance_km"))
+        .where(active_offer_filter(), GeoService.offers_within(latitude, longitude, radius_km))
+        .order_by(*keyset_order(distance, Offer.id, descending=False))
+    )
+    
+    if cursor:
+        position = decode_cursor(cursor, NUMBER, p=point)
         query = query.where(
-            or_(
-                Offer.title.ilike(search_term),
-                Offer.description.ilike(search_term)
-            )
+            keyset_condition(distance, position["k"], Offer.id, position["id"], descending=False)
         )
     
-    if sort_by == "trending":
-        query = query.order_by(desc(Offer.views_count))
-    elif sort_by == "deadline":
-        query = query.order_by(Offer.application_deadline)
-    elif sort_by == "payment":
-        query = query.order_by(desc(Offer.budget_max or Offer.budget_min))
-    else:
-        query = query.order_by(desc(Offer.published_at))
+    result = await db.execute(query.limit(limit + 1))
+    offers = result.all()
     
-    result = await db.execute(query.offset((page - 1) * limit).limit(limit))
-    offers = result.scalars().all()
+    if len(offers) > limit:
+        offers = offers[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            {"p": point, "k": offers[-1].distance_km, "id": offers[-1].id}
+        )
     
-    for offer in offers:
-        offer.views_count += 1
+    ViewCounterService.record_views(offer.id for offer in offers)
+    AnalyticsService.record(OfferEventType.IMPRESSION, (offer.id for offer in offers))
+    return offers
+
+
+@router.get("/eligible", response_model=List[OfferOut])
+async def eligible_offers(
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ofertas activas cuyos requisitos cumple el creador actual"""
+    if not current_user or current_user.user_type.value != "creator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo creators"
+        )
     
-    await db.commit()
+    profile = await db.scalar(select(Profile).where(Profile.user_id == current_user.id))
+    if not profile:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    
+    query = (
+        select(*OFFER_LIST_COLUMNS)
+        .where(active_offer_filter(), EligibilityService.offers_for_profile(profile))
+        .order_by(*keyset_order(Offer.published_at, Offer.id))
+    )
+    
+    if cursor:
+        position = decode_cursor(cursor, datetime, nullable=True)
+        query = query.where(
+            keyset_condition(Offer.published_at, position.get("k"), Offer.id, position["id"], nullable=True)
+        )
+    
+    result = await db.execute(query.limit(limit + 1))
+    offers = result.all()
+    
+    if len(offers) > limit:
+        offers = offers[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            {"k": offers[-1].published_at, "id": offers[-1].id}
+        )
     
     return offers
 
 
+@router.get("/{offer_id}/eligible-creators", response_model=List[EligibleCreatorOut])
+async def eligible_creators(
+    offer_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Creadores que cumplen los requisitos de una de mis ofertas (mayor alcance primero)"""
+    offer = await OfferService.get_offer_by_id(db, offer_id)
+    
+    if not offer:
+        raise HTTPException(status_code=404, detail="Oferta no encontrada")
+    
+    if not current_user or offer.business_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso"
+        )
+    
+    followers = profile_followers()
+    query = EligibilityService.eligible_creators_query(offer).order_by(
+        *keyset_order(followers, Profile.id)
+    )
+    
+    if cursor:
+        position = decode_cursor(cursor, int)
+        query = query.where(
+            keyset_condition(followers, position["k"], Profile.id, position["id"])
+        )
+    
+    result = await db.execute(query.limit(limit + 1))
+    profiles = result.scalars().all()
+    
+    if len(profiles) > limit:
+        profiles = profiles[:limit]
+        last = profiles[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor({
+            "k": max(last.instagram_followers or 0, last.tiktok_followers or 0),
+            "id": last.id
+        })
+    
+    return profiles
+
+
 @router.get("/{offer_id}", response_model=OfferDetailOut)
 async def get_offer(
     offer_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
-    """Obtener detalles de oferta"""
-    offer = await OfferService.get_offer_by_id(db, offer_id)
+    """
+    Obtener detalles de oferta
+
+    Soporta GET condicional: con `If-None-Match` igual al ETag actual se
+    responde 304 consultando sólo las columnas de versión.
+    """
+    version = await OfferService.get_offer_version(db, offer_id)
     
-    if not offer:
+    if not version:
         raise HTTPException(status_code=404, detail="Oferta no encontrada")
     
-    if offer.status != OfferStatus.ACTIVE or not offer.is_public:
-        if not current_user or current_user.id != offer.business_id:
+    if version.status != OfferStatus.ACTIVE or not version.is_public:
+        if not current_user or current_user.id != version.business_id:
             raise HTTPException(status_code=404, detail="Oferta no encontrada")
     
-    offer.views_count += 1
-    await db.commit()
+    ViewCounterService.record_views([offer_id])
+    AnalyticsService.record(OfferEventType.DETAIL_VIEW, [offer_id])
+    
+    etag = OfferService.offer_etag(version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
+    offer = await OfferService.get_offer_by_id(db, offer_id)
+    if not offer:
+        raise HTTPException(status_code=404, detail="Oferta no encontrada")
+    
+    set_etag(response, OfferService.offer_etag(offer))
     return offer
 
 
+@router.get("/{offer_id}/analytics", response_model=OfferAnalyticsOut)
+async def offer_analytics(
+    offer_id: int,
+    days: int = Query(30, ge=1, le=settings.ANALYTICS_MAX_DAYS),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Impresiones, vistas de detalle, aplicaciones y aceptaciones por día
+
+    Se lee de la tabla de agregados diarios (una fila por día como máximo),
+    con el retraso del rollup periódico respecto a los eventos en vivo.
+    """
+    version = await OfferService.get_offer_version(db, offer_id)
+    
+    if not version:
+        raise HTTPException(status_code=404, detail="Oferta no encontrada")
+    
+    if not current_user or version.business_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso"
+        )
+    
+    return {
+        "offer_id": offer_id,
+        "days": await AnalyticsService.daily_stats(db, offer_id, days),
+    }
+
+
 @router.patch("/{offer_id}", response_model=OfferOut)
 async def update_offer(
     offer_id: int,
@@ -163,9 +533,11 @@ async def publish_offer(
     offer.status = OfferStatus.ACTIVE
     offer.is_public = True
     offer.published_at = datetime.utcnow()
+    offer.trending_score = TrendingService.event_term(WEIGHT_PUBLISH, offer.published_at)
     
     await db.commit()
     await db.refresh(offer)
+    await FeedCacheService.invalidate(offer.category)
     
     return offer
 
@@ -188,31 +560,55 @@ async def archive_offer(
             detail="No tienes permiso"
         )
     
+    was_listed = offer.status == OfferStatus.ACTIVE and offer.is_public
     offer.status = OfferStatus.ARCHIVED
     await db.commit()
     
+    if was_listed:
+        await FeedCacheService.invalidate(offer.category)
+    
     return {"message": "Oferta archivada"}
 
 
-@router.get("/me/created", response_model=List[OfferOut])
+@router.get("/me/created", response_model=List[MyOfferOut])
 async def my_offers(
-    status: Optional[OfferStatus] = Query(None),
+    response: Response,
+    status_filter: Optional[OfferStatus] = Query(None, alias="status"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de X-Next-Cursor"),
+    limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Mis ofertas creadas"""
+    """
+    Mis ofertas creadas, de la más reciente a la más antigua
+
+    Cada oferta incluye `application_stats` (aplicaciones por estado),
+    calculado en la misma consulta que la página. Paginación por cursor
+    con la cabecera `X-Next-Cursor`.
+    """
     if current_user.user_type.value not in ["business", "agency"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Solo business y agency"
         )
     
-    query = select(Offer).where(Offer.business_id == current_user.id)
+    conditions = [Offer.business_id == current_user.id]
+    
+    if status_filter:
+        conditions.append(Offer.status == status_filter)
+    
+    if cursor:
+        position = decode_cursor(cursor, datetime)
+        conditions.append(keyset_condition(Offer.created_at, position["k"], Offer.id, position["id"]))
     
-    if status:
-        query = query.where(Offer.status == status)
+    offers, stats = await OfferService.business_offers_page(db, OFFER_LIST_COLUMNS, conditions, limit + 1)
     
-    query = query.order_by(desc(Offer.created_at))
+    if len(offers) > limit:
+        offers, stats = offers[:limit], stats[:limit]
+        last = offers[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor({"k": last.created_at, "id": last.id})
     
-    result = await db.execute(query)
-    return result.scalars().all()
+    return [
+        {**offer._mapping, "application_stats": offer_stats}
+        for offer, offer_stats in zip(offers, stats)
+    ]
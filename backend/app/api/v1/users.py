@@ -1,13 +1,18 @@
 """User and Profile endpoints"""
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 
 from app.schemas import UserMeOut, UserOut, UpdateProfileRequest
+from app.schemas.offer import NearbyCreatorOut
 from app.models import User, Profile
 from app.database import get_db
 from app.utils.dependencies import get_current_user
+from app.utils.http_cache import make_etag, etag_matches, set_etag, not_modified
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_order, keyset_condition, NUMBER
+from app.utils.geo import geohash_or_none
+from app.services.geo_service import GeoService
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
@@ -57,6 +62,7 @@ async def update_current_user_profile(
     - instagram_handle: Usuario de Instagram
     - tiktok_handle: Usuario de TikTok
     - timezone: Zona horaria
+    - latitude / longitude: Ubicación (búsquedas por cercanía; no se publica)
     """
     # Obtener el perfil actual
     if not current_user.profile:
@@ -87,15 +93,70 @@ async def update_current_user_profile(
     if profile_data.timezone is not None:
         current_user.profile.timezone = profile_data.timezone
 
+    if profile_data.latitude is not None and profile_data.longitude is not None:
+        current_user.profile.latitude = profile_data.latitude
+        current_user.profile.longitude = profile_data.longitude
+        current_user.profile.geohash = geohash_or_none(profile_data.latitude, profile_data.longitude)
+
     await db.commit()
     await db.refresh(current_user)
 
     return current_user
 
 
+@router.get("/creators/nearby", response_model=List[NearbyCreatorOut])
+async def nearby_creators(
+    response: Response,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=100),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Creadores a menos de `radius_km` de mi local, del más cercano al más lejano
+
+    Sin `latitude` / `longitude` se usa la ubicación de mi perfil.
+    """
+    if not current_user or current_user.user_type.value not in ["business", "agency"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo business y agency"
+        )
+
+    latitude, longitude = await GeoService.resolve_point(db, current_user, latitude, longitude)
+    point = [latitude, longitude, radius_km]
+
+    distance = GeoService.profile_distance(latitude, longitude)
+    query = GeoService.nearby_creators_query(latitude, longitude, radius_km).order_by(
+        *keyset_order(distance, Profile.id, descending=False)
+    )
+
+    if cursor:
+        position = decode_cursor(cursor, NUMBER, p=point)
+        query = query.where(
+            keyset_condition(distance, position["k"], Profile.id, position["id"], descending=False)
+        )
+
+    result = await db.execute(query.limit(limit + 1))
+    creators = result.all()
+
+    if len(creators) > limit:
+        creators = creators[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            {"p": point, "k": creators[-1].sort_key, "id": creators[-1].id}
+        )
+
+    return creators
+
+
 @router.get("/{user_id}", response_model=UserOut)
 async def get_user_by_id(
     user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -107,8 +168,33 @@ async def get_user_by_id(
     - Perfil público (tier, karma, redes sociales, rating)
     - NO incluye información sensible (email completo, providers OAuth)
 
+    Soporta GET condicional con `If-None-Match` (304 sin cargar el usuario).
+
     Nota: Se requiere autenticación para ver perfiles de otros usuarios
     """
+    # Si el usuario solicitado es el mismo que el actual, redirigir a /me
+    if current_user and user_id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Para obtener tu propio perfil usa GET /users/me"
+        )
+
+    version = (await db.execute(
+        select(User.updated_at, Profile.updated_at.label("profile_updated_at"))
+        .outerjoin(Profile, Profile.user_id == User.id)
+        .where(User.id == user_id)
+    )).first()
+
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario no encontrado"
+        )
+
+    etag = make_etag("user", user_id, version.updated_at, version.profile_updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     stmt = select(User).where(User.id == user_id)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
@@ -119,11 +205,5 @@ async def get_user_by_id(
             detail="Usuario no encontrado"
         )
 
-    # Si el usuario solicitado es el mismo que el actual, redirigir a /me
-    if user.id == current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Para obtener tu propio perfil usa GET /users/me"
-        )
-
+    set_etag(response, etag)
     return user
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     # App
@@ -51,6 +51,57 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://redis:6379"
     
+    # Cache del feed anónimo de ofertas
+    FEED_CACHE_ENABLED: bool = True
+    FEED_CACHE_TTL_SECONDS: int = 60
+    FEED_CACHE_MAX_PAGE: int = 3
+    FEED_CACHE_LOCK_MS: int = 2000
+    OFFER_FACETS_CACHE_TTL_SECONDS: int = 30
+    
+    # Contadores de vistas (write-behind)
+    VIEWS_FLUSH_INTERVAL_SECONDS: int = 10
+    
+    # Cierre automático de ofertas vencidas
+    OFFER_SCHEDULER_INTERVAL_SECONDS: int = 60
+    OFFER_CLOSE_BATCH_SIZE: int = 500
+    
+    # Revisión de aplicaciones en lote
+    REVIEW_BATCH_MAX_DECISIONS: int = 1000
+    
+    # Reconciliación de applications_count / accepted_count
+    COUNTER_RECONCILE_INTERVAL_SECONDS: int = 3600
+    
+    # Analítica de ofertas (eventos y rollup diario)
+    ANALYTICS_FLUSH_INTERVAL_SECONDS: int = 10
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: int = 60
+    ANALYTICS_ROLLUP_GRACE_SECONDS: int = 30
+    ANALYTICS_MAX_DAYS: int = 365
+    
+    # Monedas: valor de una unidad en BASE_CURRENCY (tasas de referencia para
+    # ordenar por pago; al cambiarlas se recalculan al arrancar)
+    BASE_CURRENCY: str = "USD"
+    CURRENCY_RATES: Dict[str, float] = {
+        "USD": 1.0,
+        "EUR": 1.08,
+        "GBP": 1.27,
+        "MXN": 0.055,
+        "BRL": 0.18,
+        "ARS": 0.0011,
+        "CLP": 0.00105,
+        "COP": 0.00024,
+        "PEN": 0.27,
+    }
+    
+    # Importación masiva de ofertas
+    BULK_OFFERS_MAX_ITEMS: int = 5000
+    BULK_OFFERS_CHUNK_SIZE: int = 500
+    
+    # Trending: vida media de la popularidad de una oferta
+    TRENDING_HALF_LIFE_HOURS: float = 24.0
+    
+    # Feed personalizado (sort_by=for_you): refresco de la matriz de candidatas
+    RANKING_SNAPSHOT_SECONDS: int = 60
+    
     # OpenAI
     OPENAI_API_KEY: str = ""
     
@@ -4,7 +4,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.database import init_db, close_db
+from app.database import init_db, close_db, AsyncSessionLocal
+from app.scheduler import Scheduler
+from app.services.view_counter_service import ViewCounterService
+from app.services.feed_cache_service import FeedCacheService
+from app.services.trending_service import TrendingService
+from app.services.eligibility_service import EligibilityService
+from app.services.offer_service import OfferService
+from app.services.analytics_service import AnalyticsService
+from app.services.ranking_service import RankingService
+from app.services.tier_service import TierService
+from app.services.reputation_service import ReputationService
 from app.api.v1 import auth
 from app.api.v1.users import router as users_router
 from app.api.v1.categories import router as categories_router
@@ -15,6 +25,50 @@ from app.api.v1.notifications import router as notifications_router
 from app.api.v1.messages import router as messages_router
 from app.api.v1.health import router as health_router
 
+# Background jobs
+Scheduler.add_job(
+    "close_expired_offers",
+    OfferService.close_expired_offers,
+    settings.OFFER_SCHEDULER_INTERVAL_SECONDS
+)
+Scheduler.add_job(
+    "reconcile_application_counters",
+    OfferService.reconcile_application_counters,
+    settings.COUNTER_RECONCILE_INTERVAL_SECONDS
+)
+# Cada worker vuelca su propio buffer de eventos
+Scheduler.add_job(
+    "flush_offer_events",
+    AnalyticsService.flush,
+    settings.ANALYTICS_FLUSH_INTERVAL_SECONDS,
+    exclusive=False
+)
+Scheduler.add_job(
+    "rollup_offer_events",
+    AnalyticsService.rollup,
+    settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS
+)
+# Cada worker mantiene su propia matriz de candidatas del feed personalizado
+Scheduler.add_job(
+    "refresh_ranking_candidates",
+    RankingService.refresh,
+    settings.RANKING_SNAPSHOT_SECONDS,
+    exclusive=False
+)
+
+# Backfills de columnas derivadas: una vez por arranque, en un solo worker
+def _with_session(backfill):
+    async def job():
+        async with AsyncSessionLocal() as db:
+            return await backfill(db)
+    return job
+
+Scheduler.add_startup_job("backfill_trending_scores", _with_session(TrendingService.backfill))
+Scheduler.add_startup_job("backfill_offer_requirements", _with_session(EligibilityService.backfill))
+Scheduler.add_startup_job("sync_offer_payouts", _with_session(OfferService.sync_payouts))
+Scheduler.add_startup_job("recompute_creator_tiers", _with_session(TierService.recompute_tiers))
+Scheduler.add_startup_job("backfill_profile_reputation", _with_session(ReputationService.backfill))
+
 # Lifecycle events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -24,8 +78,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"Warning: Could not initialize database on startup: {e}")
         print("The app will start anyway, but database operations may fail")
+    ViewCounterService.start()
+    Scheduler.start()
     yield
     # Shutdown
+    await Scheduler.stop()
+    try:
+        await ViewCounterService.stop()
+    except Exception as e:
+        print(f"Warning: Could not flush pending offer views: {e}")
+    try:
+        await AnalyticsService.flush()
+    except Exception as e:
+        print(f"Warning: Could not flush pending offer events: {e}")
+    await FeedCacheService.close()
     try:
         await close_db()
     except Exception as e:
@@ -46,6 +112,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Cache"],
 )
 
 # Include routers
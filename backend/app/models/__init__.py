@@ -1,5 +1,6 @@
 """User and Profile models"""
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Enum, JSON, Float, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Enum, JSON, Float, ForeignKey, Text, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -94,10 +95,13 @@ class Profile(Base):
     country = Column(String)  # ISO 3166-1 alpha-2
     city = Column(String)
     timezone = Column(String)
-    languages = Column(JSON, default=[])  # ["es", "en", "pt"]
+    languages = Column(JSONB, default=[])  # ["es", "en", "pt"]
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)  # ver app.utils.geo
     
     # Categorías de contenido (creator only)
-    categories = Column(JSON, default=[])  # ["travel", "fitness", "food"]
+    categories = Column(JSONB, default=[])  # ["travel", "fitness", "food"]
     
     # Ratings y Estadísticas
     rating = Column(Float, default=0.0)  # 0-5 stars
@@ -105,6 +109,14 @@ class Profile(Base):
     completion_rate = Column(Float, default=0.0)  # %
     response_time = Column(Integer, default=0)  # promedio horas
     
+    # Acumulados de los que se derivan las estadísticas (ver ReputationService);
+    # NULL en perfiles aún sin backfill
+    rating_sum = Column(Float, default=0.0)  # suma de calificaciones recibidas
+    collaborations_started = Column(Integer, default=0)  # como creador o business
+    collaborations_finished = Column(Integer, default=0)
+    response_hours_total = Column(Float, default=0.0)  # aplicado -> respondido (business)
+    response_count = Column(Integer, default=0)
+    
     # Bancos de cuenta (business/agency)
     bank_account = Column(JSON, nullable=True)  # {account_holder, iban, routing_number}
     
@@ -117,3 +129,17 @@ class Profile(Base):
     
     # Relación
     user = relationship("User", back_populates="profile")
+    
+    # Índices GIN para filtrar por categorías / idiomas (@>, ?|)
+    # y de alcance / país para el matching de elegibilidad; el geohash usa
+    # varchar_pattern_ops para resolver búsquedas por prefijo (LIKE 'abc%')
+    __table_args__ = (
+        Index("ix_profiles_categories", categories, postgresql_using="gin"),
+        Index("ix_profiles_languages", languages, postgresql_using="gin"),
+        Index(
+            "ix_profiles_followers",
+            func.greatest(func.coalesce(instagram_followers, 0), func.coalesce(tiktok_followers, 0)),
+        ),
+        Index("ix_profiles_country", country),
+        Index("ix_profiles_geohash", geohash, postgresql_ops={"geohash": "varchar_pattern_ops"}),
+    )
@@ -0,0 +1,51 @@
+"""Offer analytics models"""
+from sqlalchemy import Column, BigInteger, Integer, String, Date, DateTime, Enum, text
+import enum
+
+from app.database import Base
+
+class OfferEventType(str, enum.Enum):
+    IMPRESSION = "impression"    # la oferta apareció en un listado
+    DETAIL_VIEW = "detail_view"  # se abrió el detalle
+    APPLY = "apply"
+    ACCEPT = "accept"
+
+class OfferEvent(Base):
+    """
+    Flujo de eventos append-only
+
+    Cada fila agrupa `count` eventos iguales acumulados en memoria durante un
+    intervalo de volcado (ver AnalyticsService). Sin foreign key ni índices
+    secundarios para que el INSERT por lotes sea lo más barato posible; el
+    rollup lee por rangos de `id`.
+    """
+    __tablename__ = "offer_events"
+
+    id = Column(BigInteger, primary_key=True)
+    offer_id = Column(Integer, nullable=False)
+    event_type = Column(Enum(OfferEventType), nullable=False)
+    count = Column(Integer, nullable=False, default=1)
+    # Hora (UTC) de la transacción que insertó el evento
+    created_at = Column(DateTime, nullable=False, server_default=text("(now() at time zone 'utc')"))
+
+
+class OfferDailyStats(Base):
+    """Agregado por oferta y día (UTC), mantenido por AnalyticsService.rollup"""
+    __tablename__ = "offer_daily_stats"
+
+    offer_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    impressions = Column(Integer, nullable=False, default=0)
+    detail_views = Column(Integer, nullable=False, default=0)
+    applications = Column(Integer, nullable=False, default=0)
+    acceptances = Column(Integer, nullable=False, default=0)
+
+
+class RollupCheckpoint(Base):
+    """Último `offer_events.id` agregado por cada rollup"""
+    __tablename__ = "rollup_checkpoints"
+
+    name = Column(String(50), primary_key=True)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=text("(now() at time zone 'utc')"))
@@ -1,5 +1,5 @@
 """Collaboration models"""
-from sqlalchemy import Column, Integer, String, DateTime, Enum, JSON, Float, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Enum, JSON, Float, ForeignKey, Boolean, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -48,13 +48,22 @@ class Application(Base):
     
     # Timestamps
     applied_at = Column(DateTime, default=datetime.utcnow, index=True)
-    reviewed_at = Column(DateTime, nullable=True)
-    responded_at = Column(DateTime, nullable=True)
+    reviewed_at = Column(DateTime, nullable=True)   # última revisión del business
+    responded_at = Column(DateTime, nullable=True)  # primera respuesta (tiempo de respuesta)
     
     # Relaciones
     offer = relationship("Offer", back_populates="applications")
     creator = relationship("User", back_populates="applications", foreign_keys=[creator_id])
     collaboration = relationship("Collaboration", back_populates="application", uselist=False)
+    
+    __table_args__ = (
+        # Un creador aplica una sola vez por oferta (ver CollaborationService.create_application)
+        UniqueConstraint("offer_id", "creator_id", name="uq_applications_offer_creator"),
+        # Bandeja de aplicaciones de una oferta (GET /offers/{offer_id}/applications):
+        # sin filtro de estado y filtrada por estado, ambas ya en orden de keyset
+        Index("ix_applications_offer_applied", offer_id, applied_at.desc().nulls_last(), id.desc()),
+        Index("ix_applications_offer_status_applied", offer_id, status, applied_at.desc().nulls_last(), id.desc()),
+    )
 
 
 class Collaboration(Base):
@@ -107,3 +116,9 @@ class Collaboration(Base):
     # - final_submission: la submission aprobada/final (puede ser None)
     submissions = relationship("ContentSubmission", back_populates="collaboration", foreign_keys="ContentSubmission.collaboration_id")
     final_submission = relationship("ContentSubmission", foreign_keys=[submission_id], post_update=True)
+    
+    __table_args__ = (
+        # Listado por rol (GET /collaborations), ver CollaborationService.collaboration_page
+        Index("ix_collaborations_creator_created", creator_id, created_at.desc().nulls_last(), id.desc()),
+        Index("ix_collaborations_business_created", business_id, created_at.desc().nulls_last(), id.desc()),
+    )
@@ -1,6 +1,7 @@
 """Offer model"""
-from sqlalchemy import Column, String, Integer, Float, DateTime, Enum, JSON, Text, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Float, DateTime, Enum, JSON, Text, Boolean, ForeignKey, Index, Computed, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, JSONB
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import enum
 
@@ -43,10 +44,22 @@ class Offer(Base):
     budget_max = Column(Float)  # Máximo de pago (NULL si fijo)
     currency = Column(String(3), default="USD")  # ISO 4217
     payment_terms = Column(String(100))  # "upon_completion", "50_50", etc
+    # Pago efectivo COALESCE(budget_max, budget_min) en BASE_CURRENCY; clave de
+    # sort_by=payment (NULL si la moneda no tiene tasa configurada)
+    payout_base = Column(Float, nullable=True)
     
     # Requisitos Duales (Creator vs Regular Creator)
     requirements = Column(JSON, nullable=False)
     
+    # Requisitos extraídos e indexados (ver EligibilityService)
+    req_min_followers = Column(Integer, nullable=True)  # influencer
+    req_max_followers = Column(Integer, nullable=True)
+    req_verified_required = Column(Boolean, default=False)
+    req_country = Column(String(2), nullable=True)
+    req_categories = Column(JSONB, nullable=True)  # NULL = cualquier categoría
+    req_excluded_categories = Column(JSONB, nullable=True)
+    req_regular_min_followers = Column(Integer, nullable=True)  # creador regular
+    
     # Especificaciones de contenido
     content_specs = Column(JSON, nullable=False)
     
@@ -57,8 +70,13 @@ class Offer(Base):
     application_deadline = Column(DateTime, nullable=False)
     content_deadline = Column(DateTime, nullable=False)
     
+    # Ubicación del local / evento (opcional)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)  # ver app.utils.geo
+    
     # Plataformas
-    platforms = Column(JSON)  # ["instagram", "tiktok", "youtube"]
+    platforms = Column(JSONB)  # ["instagram", "tiktok", "youtube"]
     
     # Estado
     status = Column(Enum(OfferStatus), default=OfferStatus.DRAFT, index=True)
@@ -68,13 +86,68 @@ class Offer(Base):
     views_count = Column(Integer, default=0)
     applications_count = Column(Integer, default=0)
     accepted_count = Column(Integer, default=0)
+    trending_score = Column(Float, nullable=True)  # log-score con decaimiento, ver TrendingService
     
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     published_at = Column(DateTime, nullable=True)
     
+    # Búsqueda full-text (español + inglés), mantenida por Postgres
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('spanish', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('spanish', coalesce(description, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    ))
+    
     # Relaciones
     business = relationship("User", back_populates="offers", foreign_keys=[business_id])
     applications = relationship("Application", back_populates="offer", cascade="all, delete-orphan")
     collaborations = relationship("Collaboration", back_populates="offer", cascade="all, delete-orphan")
+    
+    # Índices del feed público (paginación por cursor: clave de orden + id)
+    __table_args__ = (
+        Index("ix_offers_search_vector", search_vector, postgresql_using="gin"),
+        Index("ix_offers_platforms", platforms, postgresql_using="gin"),
+        Index(
+            "ix_offers_req_min_followers", req_min_followers, req_max_followers,
+            postgresql_where=text("status = 'ACTIVE' AND is_public"),
+        ),
+        Index(
+            "ix_offers_req_regular_min_followers", req_regular_min_followers,
+            postgresql_where=text("status = 'ACTIVE' AND is_public"),
+        ),
+        Index("ix_offers_req_categories", req_categories, postgresql_using="gin"),
+        Index(
+            "ix_offers_feed_recent",
+            published_at.desc().nulls_last(), id.desc(),
+            postgresql_where=text("status = 'ACTIVE' AND is_public"),
+        ),
+        Index(
+            "ix_offers_feed_trending",
+            trending_score.desc().nulls_last(), id.desc(),
+            postgresql_where=text("status = 'ACTIVE' AND is_public"),
+        ),
+        Index(
+            "ix_offers_feed_deadline",
+            application_deadline, id,
+            postgresql_where=text("status = 'ACTIVE' AND is_public"),
+        ),
+        Index(
+            "ix_offers_feed_payout",
+            payout_base.desc().nulls_last(), id.desc(),
+            postgresql_where=text("status = 'ACTIVE' AND is_public"),
+        ),
+        # Panel de la empresa (`/offers/me/created`)
+        Index("ix_offers_business_created", business_id, created_at.desc().nulls_last(), id.desc()),
+        Index(
+            "ix_offers_geohash", geohash,
+            postgresql_ops={"geohash": "varchar_pattern_ops"},
+            postgresql_where=text("status = 'ACTIVE' AND is_public"),
+        ),
+    )
@@ -0,0 +1,103 @@
+"""In-process periodic job scheduler"""
+import asyncio
+import zlib
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import select, func
+
+from app.database import engine
+
+
+class Scheduler:
+    """
+    Ejecuta jobs periódicos dentro del proceso (arrancado desde el lifespan)
+
+    Con `exclusive=True` cada tick intenta tomar un advisory lock de Postgres
+    derivado del nombre del job; si otro worker de uvicorn ya lo tiene, ese
+    tick se salta. Así sólo un worker ejecuta el job a la vez.
+    """
+
+    _jobs: List[Tuple[str, Callable[[], Awaitable], float, bool]] = []
+    _startup_jobs: List[Tuple[str, Callable[[], Awaitable]]] = []
+    _tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def add_job(cls, name: str, job: Callable[[], Awaitable], interval: float, exclusive: bool = True):
+        """Registrar un job (llamar antes de `start`)"""
+        cls._jobs.append((name, job, interval, exclusive))
+
+    @classmethod
+    def add_startup_job(cls, name: str, job: Callable[[], Awaitable]):
+        """
+        Registrar un job que se ejecuta una sola vez al arrancar (llamar antes de `start`)
+
+        Corre en segundo plano, en orden de registro y siempre exclusivo: de
+        los workers que arrancan a la vez sólo el que toma el lock lo
+        ejecuta. Debe ser idempotente y barato cuando no hay nada que hacer,
+        porque un worker que arranca más tarde lo vuelve a intentar. Un
+        fallo se registra y no impide los siguientes.
+        """
+        cls._startup_jobs.append((name, job))
+
+    @staticmethod
+    def lock_key(name: str) -> int:
+        return zlib.crc32(f"influfinder:{name}".encode("utf-8"))
+
+    @classmethod
+    async def run_once(cls, name: str, job: Callable[[], Awaitable], exclusive: bool = True) -> Optional[object]:
+        """Ejecutar un tick del job; devuelve None si otro worker tiene el lock"""
+        if not exclusive:
+            return await job()
+
+        key = cls.lock_key(name)
+        async with engine.connect() as conn:
+            locked = await conn.scalar(select(func.pg_try_advisory_lock(key)))
+            await conn.commit()
+            if not locked:
+                return None
+            try:
+                return await job()
+            finally:
+                await conn.execute(select(func.pg_advisory_unlock(key)))
+                await conn.commit()
+
+    @classmethod
+    async def _loop(cls, name: str, job: Callable[[], Awaitable], interval: float, exclusive: bool):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await cls.run_once(name, job, exclusive)
+            except Exception as e:
+                print(f"Warning: Scheduled job '{name}' failed: {e}")
+
+    @classmethod
+    async def _run_startup_jobs(cls):
+        for name, job in cls._startup_jobs:
+            try:
+                await cls.run_once(name, job)
+            except Exception as e:
+                print(f"Warning: Startup job '{name}' failed: {e}")
+
+    @classmethod
+    def start(cls):
+        """Arrancar todos los jobs registrados"""
+        if cls._tasks:
+            return
+        cls._tasks = [
+            asyncio.create_task(cls._loop(name, job, interval, exclusive))
+            for name, job, interval, exclusive in cls._jobs
+        ]
+        if cls._startup_jobs:
+            cls._tasks.append(asyncio.create_task(cls._run_startup_jobs()))
+
+    @classmethod
+    async def stop(cls):
+        """Cancelar los jobs en curso"""
+        for task in cls._tasks:
+            task.cancel()
+        for task in cls._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        cls._tasks = []
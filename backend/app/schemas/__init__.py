@@ -38,6 +38,10 @@ class UserRegisterEmail(BaseModel):
             raise ValueError('Debe contener carácter especial')
         return v
     
+    @validator('country')
+    def country_code(cls, v):
+        return v.upper()
+    
     @validator('confirm_password')
     def passwords_match(cls, v, values):
         if 'password' in values and v != values['password']:
@@ -50,7 +54,11 @@ class UserRegisterOAuth(BaseModel):
     provider: AuthProvider
     access_token: str
     user_type: UserType
-    country: Optional[str] = None
+    country: Optional[str] = Field(None, min_length=2, max_length=2)
+    
+    @validator('country')
+    def country_code(cls, v):
+        return v.upper() if v else v
     
     @validator('provider')
     def provider_is_oauth(cls, v):
@@ -88,6 +96,8 @@ class ProfileOut(BaseModel):
     tiktok_followers: int = 0
     rating: float = 0.0
     rating_count: int = 0
+    completion_rate: float = 0.0
+    response_time: int = 0
     categories: List[str] = []
     country: Optional[str] = None
     city: Optional[str] = None
@@ -160,6 +170,8 @@ class UpdateProfileRequest(BaseModel):
     instagram_handle: Optional[str] = None
     tiktok_handle: Optional[str] = None
     timezone: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     
     @validator('bio')
     def bio_length(cls, v):
@@ -4,6 +4,8 @@ from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
+from app.schemas.offer import OfferCategory, OfferStatus
+
 class ApplicationStatus(str, Enum):
     APPLIED = "applied"
     UNDER_REVIEW = "under_review"
@@ -11,6 +13,11 @@ class ApplicationStatus(str, Enum):
     REJECTED = "rejected"
     WITHDRAWN = "withdrawn"
 
+class ApplicationDecisionStatus(str, Enum):
+    """Estados a los que un business puede llevar una aplicación en lote"""
+    ACCEPTED = "accepted"
+    REJECTED = "rejected"
+
 class CollaborationStatus(str, Enum):
     ACCEPTED = "accepted"
     SCHEDULED = "scheduled"
@@ -60,6 +67,61 @@ class ApplicationReview(BaseModel):
     rejection_reason: Optional[str] = None
 
 
+class CreatorSummaryOut(BaseModel):
+    """Resumen del perfil del creador en la bandeja de aplicaciones"""
+    user_id: int
+    full_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+    tier_level: int = 0
+    karma_score: int = 0
+    instagram_handle: Optional[str] = None
+    instagram_followers: int = 0
+    instagram_verified: bool = False
+    tiktok_handle: Optional[str] = None
+    tiktok_followers: int = 0
+    tiktok_verified: bool = False
+    rating: float = 0.0
+    rating_count: int = 0
+    categories: List[str] = []
+    country: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class ApplicantOut(ApplicationMeOut):
+    """Aplicación recibida (business) con el perfil del creador"""
+    creator_id: int
+    rejection_reason: Optional[str] = None
+    creator: Optional[CreatorSummaryOut] = None
+
+
+class ApplicationDecision(BaseModel):
+    """Decisión sobre una aplicación dentro de una revisión en lote"""
+    application_id: int
+    status: ApplicationDecisionStatus
+    rejection_reason: Optional[str] = Field(None, max_length=500)
+
+
+class ApplicationReviewBatch(BaseModel):
+    """Revisar varias aplicaciones de una oferta (business)"""
+    decisions: List[ApplicationDecision] = Field(..., min_length=1)
+
+
+class ApplicationDecisionErrorOut(BaseModel):
+    """Decisión que no se aplicó"""
+    application_id: int
+    error: str
+
+
+class ApplicationReviewBatchOut(BaseModel):
+    """Resultado de una revisión en lote"""
+    reviewed: int
+    accepted: int
+    rejected: int
+    errors: List[ApplicationDecisionErrorOut]
+
+
 class ApplicationWithdraw(BaseModel):
     """Retirar aplicación"""
     reason: Optional[str] = None
@@ -109,6 +171,25 @@ class CollaborationOut(BaseModel):
         from_attributes = True
 
 
+class OfferSummaryOut(BaseModel):
+    """Resumen de la oferta embebido en el listado de colaboraciones"""
+    id: int
+    title: str
+    category: OfferCategory
+    status: OfferStatus
+    budget_min: float
+    currency: str
+    content_deadline: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class CollaborationListOut(CollaborationOut):
+    """Colaboración del listado, con la oferta si se pide `include_offer`"""
+    offer: Optional[OfferSummaryOut] = None
+
+
 class CollaborationDetailOut(CollaborationOut):
     """Colaboración con detalles"""
     agreed_deliverables: dict = {}
@@ -1,9 +1,11 @@
 """Offer schemas"""
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
+from app.schemas import ProfileOut
+
 class OfferCategory(str, Enum):
     TRAVEL = "travel"
     FASHION = "fashion"
@@ -33,7 +35,15 @@ class InfluencerRequirements(BaseModel):
     verified_required: bool = False
     categories: Optional[List[str]] = None
     excluded_categories: Optional[List[str]] = None
-    country_required: Optional[str] = None
+    country_required: Optional[str] = Field(None, min_length=2, max_length=2, description="ISO 3166-1 alpha-2")
+    
+    @validator('country_required')
+    def country_code(cls, v):
+        if v is None:
+            return v
+        if not v.isalpha():
+            raise ValueError('Debe ser un código de país ISO 3166-1 alpha-2')
+        return v.upper()
 
 
 class RegularCreatorRequirements(BaseModel):
@@ -83,6 +93,9 @@ class OfferCreate(BaseModel):
     
     platforms: List[str] = Field(..., min_items=1, description="instagram, tiktok, youtube, facebook")
     
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Ubicación del local / evento")
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    
     @validator('budget_max')
     def budget_max_validation(cls, v, values):
         if v and 'budget_min' in values and v < values['budget_min']:
@@ -105,6 +118,8 @@ class OfferUpdate(BaseModel):
     budget_max: Optional[float] = None
     payment_terms: Optional[str] = None
     content_deadline: Optional[datetime] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class OfferOut(BaseModel):
@@ -117,6 +132,8 @@ class OfferOut(BaseModel):
     budget_max: Optional[float] = None
     currency: str
     platforms: List[str]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     content_specs: Dict
     application_deadline: datetime
     content_deadline: datetime
@@ -127,6 +144,7 @@ class OfferOut(BaseModel):
     accepted_count: int
     created_at: datetime
     published_at: Optional[datetime] = None
+    highlight: Optional[str] = Field(None, description="Fragmento resaltado (sólo con search)")
     
     class Config:
         from_attributes = True
@@ -139,3 +157,83 @@ class OfferDetailOut(OfferOut):
     
     class Config:
         from_attributes = True
+
+
+class EligibleCreatorOut(ProfileOut):
+    """Creador que cumple los requisitos de una oferta"""
+    user_id: int
+    instagram_verified: bool = False
+    tiktok_verified: bool = False
+
+
+class NearbyOfferOut(OfferOut):
+    """Oferta con su distancia al punto de búsqueda"""
+    distance_km: float
+
+
+class ApplicationStatsOut(BaseModel):
+    """Aplicaciones recibidas por una oferta, por estado"""
+    applied: int = 0
+    under_review: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    withdrawn: int = 0
+
+
+class MyOfferOut(OfferOut):
+    """Oferta propia con el resumen de sus aplicaciones"""
+    application_stats: ApplicationStatsOut
+
+
+class NearbyCreatorOut(ProfileOut):
+    """Creador cercano (sin sus coordenadas exactas)"""
+    user_id: int
+    distance_km: float
+
+
+class BulkOfferCreatedOut(BaseModel):
+    """Oferta creada en una importación (índice en el cuerpo enviado)"""
+    index: int
+    id: int
+
+
+class BulkOfferErrorOut(BaseModel):
+    """Elemento rechazado en una importación"""
+    index: int
+    errors: List[Any]
+
+
+class BulkOfferResultOut(BaseModel):
+    """Resultado de una importación masiva"""
+    created: List[BulkOfferCreatedOut]
+    errors: List[BulkOfferErrorOut]
+
+
+class OfferDailyStatsOut(BaseModel):
+    """Eventos de una oferta en un día (UTC)"""
+    day: date
+    impressions: int = 0
+    detail_views: int = 0
+    applications: int = 0
+    acceptances: int = 0
+
+
+class OfferAnalyticsOut(BaseModel):
+    """Serie diaria de analítica de una oferta"""
+    offer_id: int
+    days: List[OfferDailyStatsOut]
+
+
+class BudgetBucketOut(BaseModel):
+    """Rango de presupuesto (budget_min) con su número de ofertas"""
+    min: float
+    max: Optional[float] = None
+    count: int
+
+
+class OfferFacetsOut(BaseModel):
+    """Contadores por faceta para la pantalla de búsqueda"""
+    total: int
+    categories: Dict[str, int]
+    platforms: Dict[str, int]
+    budget: List[BudgetBucketOut]
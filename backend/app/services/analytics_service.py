@@ -0,0 +1,146 @@
+"""Offer analytics: event stream and daily rollups"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from sqlalchemy import select, insert, func, cast, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.analytics import OfferEvent, OfferEventType, OfferDailyStats, RollupCheckpoint
+
+# Nombre del checkpoint del rollup diario en rollup_checkpoints
+DAILY_ROLLUP = "offer_daily_stats"
+
+# Columna de OfferDailyStats que acumula cada tipo de evento
+ROLLUP_COLUMNS = {
+    OfferEventType.IMPRESSION: "impressions",
+    OfferEventType.DETAIL_VIEW: "detail_views",
+    OfferEventType.APPLY: "applications",
+    OfferEventType.ACCEPT: "acceptances",
+}
+
+
+class AnalyticsService:
+    """
+    Eventos de ofertas (impresión, detalle, aplicación, aceptación)
+
+    `record` sólo suma en un Counter en memoria; `flush` (cada worker, desde
+    el Scheduler) inserta el buffer como un lote de filas `offer_events`.
+    `rollup` (un solo worker) agrega los eventos nuevos desde el último
+    checkpoint en `offer_daily_stats`, así que leer las estadísticas de una
+    oferta no depende del volumen de eventos.
+    """
+
+    _pending: Counter = Counter()
+
+    @classmethod
+    def record(cls, event_type: OfferEventType, offer_ids: Iterable[int]):
+        """Registrar eventos (sin tocar la base de datos)"""
+        cls._pending.update((offer_id, event_type) for offer_id in offer_ids)
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Insertar los eventos acumulados; devuelve cuántas filas se escribieron"""
+        events, cls._pending = cls._pending, Counter()
+        if not events:
+            return 0
+
+        rows = [
+            {"offer_id": offer_id, "event_type": event_type, "count": count}
+            for (offer_id, event_type), count in events.items()
+        ]
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(OfferEvent), rows)
+                await db.commit()
+        except Exception:
+            cls._pending.update(events)
+            raise
+        return len(rows)
+
+    @staticmethod
+    async def rollup() -> int:
+        """
+        Agregar los eventos nuevos en offer_daily_stats
+
+        Procesa el rango (checkpoint, max_id] con un único INSERT ... SELECT
+        ... GROUP BY ... ON CONFLICT DO UPDATE que suma a los contadores del
+        día, y avanza el checkpoint en la misma transacción. Sólo se toman
+        eventos con más de ANALYTICS_ROLLUP_GRACE_SECONDS de antigüedad para
+        no saltarse ids de transacciones de volcado aún sin confirmar.
+        Devuelve el número de filas (oferta, día) actualizadas.
+        """
+        async with AsyncSessionLocal() as db:
+            start = await db.scalar(
+                select(RollupCheckpoint.last_event_id)
+                .where(RollupCheckpoint.name == DAILY_ROLLUP)
+                .with_for_update()
+            ) or 0
+
+            settled = datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_ROLLUP_GRACE_SECONDS)
+            end = await db.scalar(
+                select(func.max(OfferEvent.id)).where(OfferEvent.id > start, OfferEvent.created_at < settled)
+            )
+            if end is None:
+                return 0
+
+            day = cast(OfferEvent.created_at, Date)
+            counts = (
+                select(
+                    OfferEvent.offer_id,
+                    day.label("day"),
+                    *(
+                        func.coalesce(
+                            func.sum(OfferEvent.count).filter(OfferEvent.event_type == event_type), 0
+                        ).label(column)
+                        for event_type, column in ROLLUP_COLUMNS.items()
+                    )
+                )
+                .where(OfferEvent.id > start, OfferEvent.id <= end)
+                .group_by(OfferEvent.offer_id, day)
+            )
+
+            columns = ["offer_id", "day", *ROLLUP_COLUMNS.values()]
+            upsert = pg_insert(OfferDailyStats).from_select(columns, counts)
+            upsert = upsert.on_conflict_do_update(
+                index_elements=[OfferDailyStats.offer_id, OfferDailyStats.day],
+                set_={
+                    column: getattr(OfferDailyStats, column) + getattr(upsert.excluded, column)
+                    for column in ROLLUP_COLUMNS.values()
+                }
+            )
+            result = await db.execute(upsert)
+
+            checkpoint = pg_insert(RollupCheckpoint).values(name=DAILY_ROLLUP, last_event_id=end)
+            await db.execute(checkpoint.on_conflict_do_update(
+                index_elements=[RollupCheckpoint.name],
+                set_={"last_event_id": end, "updated_at": datetime.utcnow()}
+            ))
+            await db.commit()
+            return result.rowcount
+
+    @staticmethod
+    async def daily_stats(db: AsyncSession, offer_id: int, days: int) -> List[dict]:
+        """Estadísticas de los últimos `days` días (UTC), incluidos los días sin eventos"""
+        today = datetime.utcnow().date()
+        since = today - timedelta(days=days - 1)
+
+        result = await db.execute(
+            select(OfferDailyStats)
+            .where(OfferDailyStats.offer_id == offer_id, OfferDailyStats.day >= since)
+            .order_by(OfferDailyStats.day)
+        )
+        by_day = {row.day: row for row in result.scalars()}
+
+        stats = []
+        for offset in range(days):
+            day = since + timedelta(days=offset)
+            row = by_day.get(day)
+            stats.append({
+                "day": day,
+                **{column: getattr(row, column) if row else 0 for column in ROLLUP_COLUMNS.values()},
+            })
+        return stats
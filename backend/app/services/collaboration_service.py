@@ -1,31 +1,208 @@
 """Collaboration service"""
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, func, literal, case, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import load_only, selectinload
+from collections import defaultdict
 from datetime import datetime
-from app.models.collaboration import Application, ApplicationStatus, Collaboration
-from app.models import Profile
-from app.schemas.collaboration import ApplicationCreate
+from typing import List, Optional
+from app.models.collaboration import Application, ApplicationStatus, Collaboration, CollaborationStatus
+from app.models.offer import Offer, OfferStatus
+from app.schemas.collaboration import (
+    ApplicationCreate, ApplicationReview, ApplicationDecision, CollaborationOut, OfferSummaryOut
+)
+from app.services.notification_service import NotificationService
+from app.services.reputation_service import ReputationService
+from app.utils.pagination import keyset_order, keyset_condition
+from app.utils.projection import schema_columns
+
+# Columnas que necesita CollaborationOut en los listados
+COLLABORATION_LIST_COLUMNS = schema_columns(Collaboration, CollaborationOut)
+OFFER_SUMMARY_COLUMNS = schema_columns(Offer, OfferSummaryOut)
 
 class CollaborationService:
     
     @staticmethod
-    async def create_application(db: AsyncSession, app_data: ApplicationCreate, creator_id: int) -> Application:
-        """Crear aplicación a oferta"""
-        application = Application(
-            offer_id=app_data.offer_id,
-            creator_id=creator_id,
-            message=app_data.message,
-            media_attachments=app_data.media_attachments or [],
-            proposed_fee=app_data.proposed_fee,
-            proposed_date=app_data.proposed_date,
-            status=ApplicationStatus.APPLIED
+    def collaboration_page(
+        user_id: int,
+        role: str,
+        limit: int,
+        status: Optional[CollaborationStatus] = None,
+        position: Optional[dict] = None
+    ):
+        """
+        Subconsulta (id, created_at) de una página de colaboraciones del usuario
+
+        Cada rol es una rama `WHERE <rol>_id = :user ORDER BY created_at DESC,
+        id DESC LIMIT n` que se resuelve con su índice compuesto
+        (ix_collaborations_creator_created / ix_collaborations_business_created);
+        con `role="all"` se combinan con UNION ALL y se vuelve a ordenar, en
+        lugar de un OR que impide usar cualquiera de los dos índices.
+        `position` es el cursor ({"k": created_at, "id": id}) de la página anterior.
+        """
+        role_columns = []
+        if role in ("creator", "all"):
+            role_columns.append(Collaboration.creator_id)
+        if role in ("business", "all"):
+            role_columns.append(Collaboration.business_id)
+        
+        branches = []
+        for index, role_column in enumerate(role_columns):
+            branch = (
+                select(Collaboration.id, Collaboration.created_at)
+                .where(role_column == user_id)
+                .order_by(*keyset_order(Collaboration.created_at, Collaboration.id))
+                .limit(limit)
+            )
+            if index:
+                # Una colaboración consigo mismo no debe salir dos veces
+                branch = branch.where(role_columns[0] != user_id)
+            if status:
+                branch = branch.where(Collaboration.status == status)
+            if position:
+                branch = branch.where(
+                    keyset_condition(Collaboration.created_at, position["k"], Collaboration.id, position["id"])
+                )
+            branches.append(branch)
+        
+        if len(branches) == 1:
+            return branches[0].subquery("page")
+        
+        combined = union_all(*(branch.subquery().select() for branch in branches)).subquery()
+        return (
+            select(combined.c.id, combined.c.created_at)
+            .order_by(*keyset_order(combined.c.created_at, combined.c.id))
+            .limit(limit)
+            .subquery("page")
+        )
+    
+    @staticmethod
+    def collaborations_query(
+        user_id: int,
+        role: str,
+        limit: int,
+        status: Optional[CollaborationStatus] = None,
+        position: Optional[dict] = None,
+        include_offer: bool = False
+    ):
+        """
+        Consulta de GET /collaborations: la página de `collaboration_page`
+        con las columnas del listado
+
+        Con `include_offer` devuelve entidades Collaboration cuya oferta
+        (resumen) se carga con un único SELECT ... IN para toda la página.
+        """
+        page = CollaborationService.collaboration_page(user_id, role, limit, status, position)
+        if include_offer:
+            query = select(Collaboration).options(
+                load_only(*COLLABORATION_LIST_COLUMNS),
+                selectinload(Collaboration.offer).load_only(*OFFER_SUMMARY_COLUMNS)
+            )
+        else:
+            query = select(*COLLABORATION_LIST_COLUMNS)
+        return query.join(page, page.c.id == Collaboration.id).order_by(
+            *keyset_order(page.c.created_at, page.c.id)
+        )
+    
+    @staticmethod
+    def offer_counter_values(applications: int = 0, accepted: int = 0) -> dict:
+        """SET de un UPDATE que suma a los contadores de la oferta (x = x + n)"""
+        values = {"updated_at": Offer.updated_at}
+        if applications:
+            values["applications_count"] = func.coalesce(Offer.applications_count, 0) + applications
+        if accepted:
+            values["accepted_count"] = func.coalesce(Offer.accepted_count, 0) + accepted
+        return values
+    
+    @staticmethod
+    async def adjust_offer_counters(db: AsyncSession, offer_id: int, applications: int = 0, accepted: int = 0):
+        """
+        Sumar a los contadores de la oferta con un UPDATE atómico (x = x + n)
+
+        No hace commit: se llama dentro de la transacción que inserta o
+        acepta la aplicación, así contador y fila se confirman juntos.
+        """
+        await db.execute(
+            update(Offer)
+            .where(Offer.id == offer_id)
+            .values(**CollaborationService.offer_counter_values(applications, accepted))
+            .execution_options(synchronize_session=False)
+        )
+    
+    @staticmethod
+    async def create_application(db: AsyncSession, app_data: ApplicationCreate, creator_id: int) -> Optional[Row]:
+        """
+        Crear aplicación a oferta en una sola sentencia
+
+        `INSERT ... SELECT FROM offers` sólo produce la fila si la oferta está
+        activa y con plazo abierto; `ON CONFLICT DO NOTHING` sobre
+        (offer_id, creator_id) descarta la aplicación repetida sin carrera
+        entre comprobar e insertar. Una CTE suma applications_count y
+        devuelve el business_id para la notificación.
+
+        Devuelve la aplicación (con `business_id`) o None si no se insertó;
+        `application_refusal` explica el motivo.
+        """
+        now = datetime.utcnow()
+        values = {
+            "creator_id": creator_id,
+            "status": ApplicationStatus.APPLIED,
+            "message": app_data.message,
+            "media_attachments": app_data.media_attachments or [],
+            "proposed_fee": app_data.proposed_fee,
+            "proposed_date": app_data.proposed_date,
+            "applied_at": now,
+        }
+        columns = Application.__table__.c
+        source = select(
+            Offer.id,
+            *(literal(value, columns[name].type) for name, value in values.items())
+        ).where(
+            Offer.id == app_data.offer_id,
+            Offer.status == OfferStatus.ACTIVE,
+            Offer.application_deadline > now
         )
         
-        db.add(application)
+        inserted = (
+            pg_insert(Application)
+            .from_select(["offer_id", *values], source)
+            .on_conflict_do_nothing(index_elements=[Application.offer_id, Application.creator_id])
+            .returning(*columns)
+            .cte("inserted")
+        )
+        counted = (
+            update(Offer)
+            .where(Offer.id == inserted.c.offer_id)
+            .values(**CollaborationService.offer_counter_values(applications=1))
+            .returning(Offer.id, Offer.business_id)
+            .cte("counted")
+        )
+        
+        application = (await db.execute(
+            select(inserted, counted.c.business_id)
+            .join_from(inserted, counted, counted.c.id == inserted.c.offer_id)
+        )).first()
         await db.commit()
-        await db.refresh(application)
         return application
     
+    @staticmethod
+    async def application_refusal(db: AsyncSession, offer_id: int, creator_id: int) -> str:
+        """Motivo por el que `create_application` no insertó: not_found, duplicate o closed"""
+        already_applied = (
+            select(Application.id)
+            .where(Application.offer_id == offer_id, Application.creator_id == creator_id)
+            .exists()
+        )
+        offer = (await db.execute(
+            select(Offer.id, already_applied.label("already_applied")).where(Offer.id == offer_id)
+        )).first()
+        if offer is None:
+            return "not_found"
+        if offer.already_applied:
+            return "duplicate"
+        return "closed"
+    
     @staticmethod
     async def create_collaboration(
         db: AsyncSession,
@@ -34,74 +211,213 @@ class CollaborationService:
         creator_id: int,
         business_id: int,
         agreed_fee: float
-    ) -> Collaboration:
-        """Crear colaboración desde aplicación aceptada"""
-        collaboration = Collaboration(
-            offer_id=offer_id,
-            application_id=application_id,
-            creator_id=creator_id,
-            business_id=business_id,
-            agreed_fee=agreed_fee
+    ):
+        """
+        Crear colaboración desde aplicación aceptada
+
+        No hace commit. Si la aplicación ya tenía colaboración (aceptada,
+        rechazada y vuelta a aceptar) no se duplica: ON CONFLICT DO NOTHING
+        sobre `application_id`, y sólo una colaboración nueva cuenta como
+        iniciada para ambas partes.
+        """
+        created = await db.scalar(
+            pg_insert(Collaboration)
+            .values(
+                offer_id=offer_id,
+                application_id=application_id,
+                creator_id=creator_id,
+                business_id=business_id,
+                agreed_fee=agreed_fee
+            )
+            .on_conflict_do_nothing(index_elements=[Collaboration.application_id])
+            .returning(Collaboration.id)
         )
+        if created is not None:
+            await ReputationService.record_started(db, {creator_id: 1, business_id: 1})
+    
+    @staticmethod
+    async def review_application(
+        db: AsyncSession,
+        application: Application,
+        business_id: int,
+        budget_min: float,
+        review: ApplicationReview
+    ) -> bool:
+        """
+        Aplicar la revisión de una aplicación en una sola transacción
+
+        Estado de la aplicación, contador accepted_count, colaboración y
+        notificación al creador se confirman con un único commit: o se
+        aplica todo o nada. `application` debe venir bloqueada
+        (SELECT ... FOR UPDATE) para que dos revisiones simultáneas no
+        cuenten dos veces la aceptación. La primera aceptación o rechazo suma
+        al tiempo de respuesta del business. Devuelve True si la aplicación pasó a
+        aceptada.
+        """
+        now = datetime.utcnow()
+        was_accepted = application.status == ApplicationStatus.ACCEPTED
+        is_accepted = review.status == ApplicationStatus.ACCEPTED
+        
+        # responded_at es la primera decisión (tiempo de respuesta), igual que en
+        # review_applications; reviewed_at, la última revisión de cualquier tipo
+        is_decision = review.status in (ApplicationStatus.ACCEPTED, ApplicationStatus.REJECTED)
+        if is_decision and application.responded_at is None:
+            application.responded_at = now
+            await ReputationService.record_responses(
+                db, business_id, [(now - application.applied_at).total_seconds() / 3600]
+            )
+        
+        application.status = review.status
+        application.reviewed_at = now
+        
+        if is_accepted != was_accepted:
+            await CollaborationService.adjust_offer_counters(
+                db, application.offer_id, accepted=1 if is_accepted else -1
+            )
+        
+        if review.status == ApplicationStatus.REJECTED:
+            application.rejection_reason = review.rejection_reason
+            await NotificationService.notify_application_rejected(
+                db, application.creator_id, application.id, commit=False
+            )
+        
+        elif is_accepted and not was_accepted:
+            await CollaborationService.create_collaboration(
+                db,
+                application.offer_id,
+                application.id,
+                application.creator_id,
+                business_id,
+                application.proposed_fee or budget_min
+            )
+            await NotificationService.notify_application_accepted(
+                db, application.creator_id, application.id, commit=False
+            )
         
-        db.add(collaboration)
         await db.commit()
-        await db.refresh(collaboration)
-        return collaboration
+        return is_accepted and not was_accepted
     
     @staticmethod
-    async def update_creator_tier(db: AsyncSession, creator_id: int):
-        """Actualizar tier del creador basado en colaboraciones completadas"""
-        profile = await db.execute(
-            select(Profile).where(Profile.user_id == creator_id)
-        )
-        profile = profile.scalar_one_or_none()
+    async def review_applications(
+        db: AsyncSession,
+        offer_id: int,
+        business_id: int,
+        budget_min: float,
+        decisions: List[ApplicationDecision]
+    ) -> dict:
+        """
+        Aplicar muchas revisiones de una oferta en una sola transacción
+
+        Mismo efecto que `review_application` por cada decisión, pero con
+        sentencias por conjunto: un SELECT ... FOR UPDATE de todas las
+        aplicaciones, un UPDATE por estado destino, un único ajuste de
+        accepted_count, un INSERT multi-fila de colaboraciones y otro de
+        notificaciones, los acumulados de reputación y un commit. Las decisiones sobre aplicaciones que no
+        son de la oferta (o repetidas en el lote) se devuelven en `errors`.
+        """
+        errors = []
+        by_id = {}
+        for decision in decisions:
+            if decision.application_id in by_id:
+                errors.append({"application_id": decision.application_id, "error": "Decisión repetida en el lote"})
+            else:
+                by_id[decision.application_id] = decision
+        
+        # Bloqueo en orden de id para no cruzarse con otros lotes de la misma oferta
+        rows = (await db.execute(
+            select(
+                Application.id,
+                Application.status,
+                Application.creator_id,
+                Application.proposed_fee,
+                Application.applied_at,
+                Application.responded_at
+            )
+            .where(Application.offer_id == offer_id, Application.id.in_(list(by_id)))
+            .order_by(Application.id)
+            .with_for_update()
+        )).all()
+        found = {row.id: row for row in rows}
+        errors += [
+            {"application_id": application_id, "error": "Aplicación no encontrada en esta oferta"}
+            for application_id in by_id if application_id not in found
+        ]
         
-        if not profile:
-            return
+        now = datetime.utcnow()
+        targets = defaultdict(list)
+        reasons = {}
+        accepted_delta = 0
+        newly_accepted = []
+        reviews = []
+        response_hours = []
+        for application_id, row in found.items():
+            decision = by_id[application_id]
+            target = ApplicationStatus(decision.status.value)
+            targets[target].append(application_id)
+            if target == ApplicationStatus.REJECTED:
+                reasons[application_id] = decision.rejection_reason
+            if row.responded_at is None:
+                response_hours.append((now - row.applied_at).total_seconds() / 3600)
+            
+            was_accepted = row.status == ApplicationStatus.ACCEPTED
+            is_accepted = target == ApplicationStatus.ACCEPTED
+            if is_accepted != was_accepted:
+                accepted_delta += 1 if is_accepted else -1
+            if is_accepted and not was_accepted:
+                newly_accepted.append(row)
+                reviews.append((row.creator_id, application_id, target))
+            elif target == ApplicationStatus.REJECTED:
+                reviews.append((row.creator_id, application_id, target))
         
-        # Contar colaboraciones completadas
-        from app.models.collaboration import CollaborationStatus
-        completed = await db.execute(
-            select(Collaboration).where(
-                Collaboration.creator_id == creator_id,
-                Collaboration.status == CollaborationStatus.COMPLETED
+        for target, application_ids in targets.items():
+            values = {
+                "status": target,
+                "reviewed_at": now,
+                "responded_at": func.coalesce(Application.responded_at, now),
+            }
+            if target == ApplicationStatus.REJECTED:
+                values["rejection_reason"] = case(reasons, value=Application.id, else_=None)
+            await db.execute(
+                update(Application)
+                .where(Application.id.in_(application_ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
             )
-        )
-        completed_count = len(completed.scalars().all())
-        
-        profile.completed_collaborations = completed_count
-        
-        # Actualizar tier basado en completadas
-        # Tier 0: 0 completadas
-        # Tier 1: 1-3 completadas (Newbie)
-        # Tier 2: 4-10 completadas (Explorer)
-        # Tier 3: 11-25 completadas (Pro)
-        # Tier 4: 26-50 completadas (Elite)
-        # Tier 5: 50+ completadas (Master/Legend)
-        
-        if completed_count == 0:
-            profile.tier_level = 0
-            profile.tier_progress = 0.0
-        elif completed_count <= 3:
-            profile.tier_level = 1
-            profile.tier_progress = (completed_count / 3) * 100
-            profile.karma_score = completed_count * 100
-        elif completed_count <= 10:
-            profile.tier_level = 2
-            profile.tier_progress = ((completed_count - 3) / 7) * 100
-            profile.karma_score = 300 + (completed_count - 3) * 50
-        elif completed_count <= 25:
-            profile.tier_level = 3
-            profile.tier_progress = ((completed_count - 10) / 15) * 100
-            profile.karma_score = 650 + (completed_count - 10) * 30
-        elif completed_count <= 50:
-            profile.tier_level = 4
-            profile.tier_progress = ((completed_count - 25) / 25) * 100
-            profile.karma_score = 1100 + (completed_count - 25) * 20
-        else:
-            profile.tier_level = 5
-            profile.tier_progress = 100.0
-            profile.karma_score = 2000 + (completed_count - 50) * 10
         
+        if accepted_delta:
+            await CollaborationService.adjust_offer_counters(db, offer_id, accepted=accepted_delta)
+        
+        await ReputationService.record_responses(db, business_id, response_hours)
+        
+        if newly_accepted:
+            created = (await db.execute(
+                pg_insert(Collaboration)
+                .values([
+                    {
+                        "offer_id": offer_id,
+                        "application_id": row.id,
+                        "creator_id": row.creator_id,
+                        "business_id": business_id,
+                        "agreed_fee": row.proposed_fee or budget_min,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for row in newly_accepted
+                ])
+                .on_conflict_do_nothing(index_elements=[Collaboration.application_id])
+                .returning(Collaboration.creator_id)
+            )).scalars().all()
+            if created:
+                started = {creator_id: 1 for creator_id in created}
+                started[business_id] = started.get(business_id, 0) + len(created)
+                await ReputationService.record_started(db, started)
+        
+        await NotificationService.notify_application_reviews(db, reviews)
         await db.commit()
+        
+        return {
+            "reviewed": len(found),
+            "accepted": len(newly_accepted),
+            "rejected": len(targets.get(ApplicationStatus.REJECTED, [])),
+            "errors": errors,
+        }
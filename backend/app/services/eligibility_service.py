@@ -0,0 +1,170 @@
+"""Creator–offer eligibility service"""
+from sqlalchemy import and_, or_, not_, false, func, select, update, cast, case, Integer, Boolean
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Profile, User, UserType
+from app.models.offer import Offer
+
+# A partir de este número de seguidores un creador es "influencer"
+INFLUENCER_MIN_FOLLOWERS = 10000
+
+
+def profile_followers():
+    """Alcance del creador: su mayor audiencia entre Instagram y TikTok"""
+    return func.greatest(
+        func.coalesce(Profile.instagram_followers, 0),
+        func.coalesce(Profile.tiktok_followers, 0)
+    )
+
+
+def country_code(value):
+    """Código ISO 3166-1 alpha-2 en mayúsculas, o None si `value` no lo es"""
+    if isinstance(value, str) and len(value) == 2 and value.isalpha():
+        return value.upper()
+    return None
+
+
+def country_code_sql(value):
+    """`country_code` como expresión SQL (req_country es String(2))"""
+    return case((value.regexp_match("^[A-Za-z]{2}$"), func.upper(value)), else_=None)
+
+
+def profile_verified():
+    return or_(Profile.instagram_verified == True, Profile.tiktok_verified == True)
+
+
+class EligibilityService:
+    """
+    Evaluación de `Offer.requirements` contra `Profile`
+
+    Los bloques `influencer` / `regular` se copian a columnas `req_*`
+    indexadas al crear la oferta, así que ambas direcciones (ofertas para un
+    creador y creadores para una oferta) son consultas SQL con índices en
+    lugar de evaluar el JSON fila a fila.
+    """
+
+    @staticmethod
+    def requirement_columns(requirements: dict) -> dict:
+        """Extraer las columnas `req_*` de un dict de requisitos"""
+        influencer = requirements.get("influencer") or {}
+        regular = requirements.get("regular") or {}
+        return {
+            "req_min_followers": influencer.get("min_followers"),
+            "req_max_followers": influencer.get("max_followers"),
+            "req_verified_required": bool(influencer.get("verified_required")),
+            "req_country": country_code(influencer.get("country_required")),
+            "req_categories": influencer.get("categories") or None,
+            "req_excluded_categories": influencer.get("excluded_categories") or None,
+            "req_regular_min_followers": regular.get("min_followers"),
+        }
+
+    @staticmethod
+    def offers_for_profile(profile: Profile):
+        """Condición WHERE de las ofertas para las que califica `profile`"""
+        followers = max(profile.instagram_followers or 0, profile.tiktok_followers or 0)
+        verified = bool(profile.instagram_verified or profile.tiktok_verified)
+        categories = list(profile.categories or [])
+
+        if followers < INFLUENCER_MIN_FOLLOWERS:
+            return and_(
+                Offer.req_regular_min_followers.isnot(None),
+                Offer.req_regular_min_followers <= followers
+            )
+
+        conditions = [
+            Offer.req_min_followers <= followers,
+            or_(Offer.req_max_followers.is_(None), Offer.req_max_followers >= followers),
+            or_(Offer.req_country.is_(None), Offer.req_country == profile.country),
+        ]
+        if not verified:
+            conditions.append(Offer.req_verified_required == False)
+        if categories:
+            conditions.append(or_(
+                Offer.req_categories.is_(None),
+                Offer.req_categories.has_any(array(categories))
+            ))
+            conditions.append(or_(
+                Offer.req_excluded_categories.is_(None),
+                not_(Offer.req_excluded_categories.has_any(array(categories)))
+            ))
+        else:
+            conditions.append(Offer.req_categories.is_(None))
+        return and_(*conditions)
+
+    @staticmethod
+    def profiles_for_offer(offer: Offer):
+        """Condición WHERE de los perfiles de creador que califican para `offer`"""
+        followers = profile_followers()
+        branches = []
+
+        if offer.req_min_followers is not None:
+            conditions = [followers >= offer.req_min_followers]
+            if offer.req_max_followers is not None:
+                conditions.append(followers <= offer.req_max_followers)
+            if offer.req_country:
+                conditions.append(Profile.country == offer.req_country)
+            if offer.req_verified_required:
+                conditions.append(profile_verified())
+            if offer.req_categories:
+                conditions.append(Profile.categories.has_any(array(offer.req_categories)))
+            if offer.req_excluded_categories:
+                conditions.append(or_(
+                    Profile.categories.is_(None),
+                    not_(Profile.categories.has_any(array(offer.req_excluded_categories)))
+                ))
+            branches.append(and_(*conditions))
+
+        if offer.req_regular_min_followers is not None:
+            branches.append(and_(
+                followers >= offer.req_regular_min_followers,
+                followers < INFLUENCER_MIN_FOLLOWERS
+            ))
+
+        if not branches:
+            return false()
+        return or_(*branches)
+
+    @staticmethod
+    def eligible_creators_query(offer: Offer):
+        """Perfiles de creadores activos que califican para `offer`"""
+        return (
+            select(Profile)
+            .join(User, User.id == Profile.user_id)
+            .where(
+                User.user_type == UserType.CREATOR,
+                User.is_active == True,
+                EligibilityService.profiles_for_offer(offer)
+            )
+        )
+
+    @staticmethod
+    async def backfill(db: AsyncSession) -> int:
+        """Rellenar las columnas `req_*` de ofertas creadas antes de existir"""
+        influencer = cast(Offer.requirements, JSONB)["influencer"]
+        regular = cast(Offer.requirements, JSONB)["regular"]
+
+        def nullable_list(value):
+            # [] o null en el JSON -> NULL (sin restricción)
+            return func.nullif(func.nullif(value, cast("null", JSONB)), cast("[]", JSONB))
+
+        result = await db.execute(
+            update(Offer)
+            .where(and_(
+                Offer.req_min_followers.is_(None),
+                Offer.req_regular_min_followers.is_(None)
+            ))
+            .values(
+                req_min_followers=cast(influencer["min_followers"].astext, Integer),
+                req_max_followers=cast(influencer["max_followers"].astext, Integer),
+                req_verified_required=func.coalesce(cast(influencer["verified_required"].astext, Boolean), False),
+                req_country=country_code_sql(influencer["country_required"].astext),
+                req_categories=nullable_list(influencer["categories"]),
+                req_excluded_categories=nullable_list(influencer["excluded_categories"]),
+                req_regular_min_followers=cast(regular["min_followers"].astext, Integer),
+                updated_at=Offer.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
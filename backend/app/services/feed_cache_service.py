@@ -0,0 +1,220 @@
+"""Redis cache for the anonymous offer feed"""
+import asyncio
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.schemas.offer import OfferOut
+
+_offer_list_adapter = TypeAdapter(List[OfferOut])
+
+# Ámbito de invalidación de los listados sin filtro de categoría
+ALL_CATEGORIES = "all"
+
+
+class FeedCacheService:
+    """
+    Cache de respuestas serializadas de `list_offers` para usuarios anónimos
+
+    Cada entrada guarda el JSON ya serializado, los ids de las ofertas (para
+    seguir contando vistas) y el cursor siguiente. Las entradas se invalidan
+    por generación: cada categoría tiene un contador `feed:gen:<categoria>`
+    que se incrementa cuando una oferta de esa categoría entra o sale del
+    feed, y las entradas con una generación anterior se consideran fallos.
+    `/offers/facets` guarda sus contadores en el mismo formato (sin ids) con
+    un TTL más corto.
+    """
+
+    _client: Optional[redis.Redis] = None
+    _inflight: Dict[str, asyncio.Future] = {}
+    stats: Counter = Counter()
+
+    @classmethod
+    def client(cls) -> redis.Redis:
+        if cls._client is None:
+            cls._client = redis.from_url(settings.REDIS_URL)
+        return cls._client
+
+    @classmethod
+    async def close(cls):
+        if cls._client is not None:
+            await cls._client.close()
+            cls._client = None
+
+    @staticmethod
+    def make_key(params: dict) -> str:
+        """Clave estable a partir de los parámetros normalizados"""
+        raw = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def scope_for(category: Optional[str]) -> str:
+        return category or ALL_CATEGORIES
+
+    @staticmethod
+    def build_entry(offers: list, next_cursor: Optional[str]) -> dict:
+        """Serializar una página del feed y calcular su TTL"""
+        ttl = settings.FEED_CACHE_TTL_SECONDS
+        now = datetime.utcnow()
+        for offer in offers:
+            # La página deja de ser válida cuando vence la primera de sus ofertas
+            until_deadline = int((offer.application_deadline - now).total_seconds())
+            ttl = min(ttl, max(until_deadline, 1))
+
+        return {
+            "body": _offer_list_adapter.dump_json(
+                _offer_list_adapter.validate_python(offers, from_attributes=True)
+            ),
+            "ids": [offer.id for offer in offers],
+            "cursor": next_cursor,
+            "ttl": ttl,
+        }
+
+    @staticmethod
+    def to_response(entry: dict, cache_status: str) -> Response:
+        headers = {"X-Cache": cache_status}
+        if entry.get("cursor"):
+            headers["X-Next-Cursor"] = entry["cursor"]
+        return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+    @classmethod
+    async def _read(cls, scope: str, key: str):
+        """Leer (generación actual, entrada) en un solo round trip"""
+        pipe = cls.client().pipeline(transaction=False)
+        pipe.get(f"feed:gen:{scope}")
+        pipe.hgetall(f"feed:entry:{key}")
+        generation, entry = await pipe.execute()
+        generation = int(generation or 0)
+
+        if not entry or int(entry.get(b"gen", -1)) != generation:
+            return generation, None
+
+        cursor = entry.get(b"cursor") or b""
+        return generation, {
+            "body": entry[b"body"],
+            "ids": [int(i) for i in entry[b"ids"].split(b",") if i],
+            "cursor": cursor.decode() or None,
+        }
+
+    @classmethod
+    async def _write(cls, key: str, generation: int, entry: dict):
+        pipe = cls.client().pipeline(transaction=True)
+        pipe.hset(f"feed:entry:{key}", mapping={
+            "gen": generation,
+            "body": entry["body"],
+            "ids": ",".join(str(i) for i in entry["ids"]),
+            "cursor": entry["cursor"] or "",
+        })
+        pipe.expire(f"feed:entry:{key}", entry["ttl"])
+        await pipe.execute()
+
+    @classmethod
+    async def _fetch(cls, scope: str, key: str, compute: Callable[[], Awaitable[dict]]):
+        generation, entry = await cls._read(scope, key)
+        if entry is not None:
+            cls.stats["hits"] += 1
+            return entry, "HIT"
+
+        # Coalescer entre workers: sólo quien obtiene el lock consulta la base de datos
+        lock_key = f"feed:lock:{key}"
+        lock_ms = settings.FEED_CACHE_LOCK_MS
+        locked = await cls.client().set(lock_key, os.getpid(), nx=True, px=lock_ms)
+        if not locked:
+            for _ in range(lock_ms // 50):
+                await asyncio.sleep(0.05)
+                _, entry = await cls._read(scope, key)
+                if entry is not None:
+                    cls.stats["coalesced"] += 1
+                    return entry, "HIT"
+
+        cls.stats["misses"] += 1
+        entry = await compute()
+        try:
+            await cls._write(key, generation, entry)
+            if locked:
+                await cls.client().delete(lock_key)
+        except redis.RedisError as e:
+            cls.stats["errors"] += 1
+            print(f"Warning: Could not store feed cache entry: {e}")
+        return entry, "MISS"
+
+    @classmethod
+    async def get_or_compute(
+        cls,
+        category: Optional[str],
+        params: dict,
+        compute: Callable[[], Awaitable[dict]]
+    ) -> Tuple[dict, str]:
+        """
+        Devolver (entrada, estado) desde la cache o calculándola con `compute`
+
+        Las peticiones concurrentes a la misma clave dentro del proceso esperan
+        al mismo cálculo. Si Redis no responde se calcula sin cache.
+        """
+        scope = cls.scope_for(category)
+        key = cls.make_key(params)
+
+        inflight = cls._inflight.get(key)
+        if inflight is not None:
+            cls.stats["coalesced"] += 1
+            entry, _ = await asyncio.shield(inflight)
+            return entry, "HIT"
+
+        future = asyncio.get_running_loop().create_future()
+        cls._inflight[key] = future
+        try:
+            try:
+                result = await cls._fetch(scope, key, compute)
+            except redis.RedisError as e:
+                cls.stats["errors"] += 1
+                print(f"Warning: Feed cache unavailable: {e}")
+                result = (await compute(), "BYPASS")
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Marcar la excepción como consumida aunque nadie estuviera esperando
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            cls._inflight.pop(key, None)
+
+    @classmethod
+    async def invalidate(cls, *categories: Optional[str]):
+        """Invalidar las páginas de las categorías dadas y los listados generales"""
+        scopes = {ALL_CATEGORIES}
+        scopes.update(getattr(c, "value", c) for c in categories if c)
+        try:
+            pipe = cls.client().pipeline(transaction=False)
+            for scope in scopes:
+                pipe.incr(f"feed:gen:{scope}")
+            await pipe.execute()
+            cls.stats["invalidations"] += 1
+        except redis.RedisError as e:
+            cls.stats["errors"] += 1
+            print(f"Warning: Could not invalidate feed cache: {e}")
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Métricas del proceso actual"""
+        lookups = cls.stats["hits"] + cls.stats["coalesced"] + cls.stats["misses"]
+        hit_rate = (cls.stats["hits"] + cls.stats["coalesced"]) / lookups if lookups else 0.0
+        return {
+            "pid": os.getpid(),
+            "hits": cls.stats["hits"],
+            "coalesced": cls.stats["coalesced"],
+            "misses": cls.stats["misses"],
+            "invalidations": cls.stats["invalidations"],
+            "errors": cls.stats["errors"],
+            "hit_rate": round(hit_rate, 4),
+        }
@@ -0,0 +1,99 @@
+"""Proximity search for offers and creators"""
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, func, cast, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Profile, User, UserType
+from app.models.offer import Offer
+from app.schemas.offer import NearbyCreatorOut
+from app.utils.geo import distance_km, within_radius, geohash_cover
+from app.utils.projection import schema_columns
+
+# Columnas de perfil que necesita NearbyCreatorOut
+NEARBY_CREATOR_COLUMNS = schema_columns(Profile, NearbyCreatorOut)
+
+# Los creadores se filtran y ordenan por el centro de su celda en esta
+# rejilla (~1.1 km), nunca por su ubicación exacta: ni el radio ni la
+# distancia permiten triangular más allá de la celda
+CREATOR_GRID_DEG = 0.01
+# Máxima distancia entre la ubicación exacta y el centro de su celda
+CREATOR_GRID_SLACK_KM = 0.8
+
+
+def _snap_to_grid(column):
+    return func.round(column / CREATOR_GRID_DEG) * CREATOR_GRID_DEG
+
+
+class GeoService:
+    """
+    Búsqueda por radio sobre `latitude` / `longitude` / `geohash`
+
+    El geohash (índice B-tree con varchar_pattern_ops) acota los candidatos a
+    las celdas que cubren el círculo; la distancia haversine se calcula en SQL
+    sólo para esos candidatos y es la clave de orden (distancia, id).
+    """
+
+    @staticmethod
+    async def resolve_point(
+        db: AsyncSession,
+        user: Optional[User],
+        latitude: Optional[float],
+        longitude: Optional[float]
+    ) -> Tuple[float, float]:
+        """Punto de búsqueda: el de la query o, si no viene, el del perfil del usuario"""
+        if latitude is not None and longitude is not None:
+            return latitude, longitude
+
+        if user is not None:
+            point = (await db.execute(
+                select(Profile.latitude, Profile.longitude).where(Profile.user_id == user.id)
+            )).first()
+            if point and point.latitude is not None and point.longitude is not None:
+                return point.latitude, point.longitude
+
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Se requieren latitude y longitude (o una ubicación en el perfil)"
+        )
+
+    @staticmethod
+    def offer_distance(latitude: float, longitude: float):
+        return distance_km(Offer.latitude, Offer.longitude, latitude, longitude)
+
+    @staticmethod
+    def offers_within(latitude: float, longitude: float, radius_km: float):
+        """Condición WHERE de las ofertas a menos de `radius_km`"""
+        return within_radius(Offer.geohash, Offer.latitude, Offer.longitude, latitude, longitude, radius_km)
+
+    @staticmethod
+    def profile_distance(latitude: float, longitude: float):
+        """Distancia al centro de la celda del creador (ver CREATOR_GRID_DEG)"""
+        return distance_km(_snap_to_grid(Profile.latitude), _snap_to_grid(Profile.longitude), latitude, longitude)
+
+    @staticmethod
+    def nearby_creators_query(latitude: float, longitude: float, radius_km: float):
+        """
+        Perfiles de creadores activos a menos de `radius_km`, con su distancia redondeada
+
+        Radio y orden usan la posición en rejilla; el prefiltro por geohash
+        (ubicación exacta) se amplía CREATOR_GRID_SLACK_KM para no perder
+        creadores cuya celda cae dentro del radio.
+        """
+        distance = GeoService.profile_distance(latitude, longitude)
+        return (
+            select(
+                *NEARBY_CREATOR_COLUMNS,
+                # Distancia a la celda, redondeada a 100 m
+                func.round(cast(distance, Numeric), 1).label("distance_km"),
+                distance.label("sort_key"),
+            )
+            .join(User, User.id == Profile.user_id)
+            .where(
+                User.user_type == UserType.CREATOR,
+                User.is_active == True,
+                geohash_cover(Profile.geohash, latitude, longitude, radius_km + CREATOR_GRID_SLACK_KM),
+                distance <= radius_km
+            )
+        )
@@ -1,8 +1,25 @@
 """Notification service"""
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, literal, and_
 from datetime import datetime
+from typing import List
 from app.models.notification import Notification, NotificationType
+from app.models.collaboration import Application, ApplicationStatus
+from app.models.offer import Offer
+
+# Título y texto de la notificación al creador según la revisión de su aplicación
+APPLICATION_REVIEW_MESSAGES = {
+    ApplicationStatus.ACCEPTED: (
+        NotificationType.APPLICATION_ACCEPTED,
+        "¡Aplicación aceptada!",
+        "Tu aplicación ha sido aceptada. Es hora de negociar los detalles.",
+    ),
+    ApplicationStatus.REJECTED: (
+        NotificationType.APPLICATION_REJECTED,
+        "Aplicación rechazada",
+        "Tu aplicación ha sido rechazada. Sigue intentando con otras ofertas.",
+    ),
+}
 
 class NotificationService:
     
@@ -17,9 +34,15 @@ class NotificationService:
         related_collaboration_id: int = None,
         related_application_id: int = None,
         related_user_id: int = None,
-        data: dict = None
+        data: dict = None,
+        commit: bool = True
     ) -> Notification:
-        """Crear notificación"""
+        """
+        Crear notificación
+
+        Con `commit=False` sólo se añade a la sesión y se inserta en el
+        commit de la transacción que la origina.
+        """
         notification = Notification(
             user_id=user_id,
             type=notification_type,
@@ -33,8 +56,9 @@ class NotificationService:
         )
         
         db.add(notification)
-        await db.commit()
-        await db.refresh(notification)
+        if commit:
+            await db.commit()
+            await db.refresh(notification)
         return notification
     
     @staticmethod
@@ -50,29 +74,57 @@ class NotificationService:
         )
     
     @staticmethod
-    async def notify_application_accepted(db: AsyncSession, creator_id: int, application_id: int):
+    async def notify_application_accepted(db: AsyncSession, creator_id: int, application_id: int, commit: bool = True):
         """Notificar aplicación aceptada"""
         await NotificationService.create_notification(
             db,
             creator_id,
-            NotificationType.APPLICATION_ACCEPTED,
-            "¡Aplicación aceptada!",
-            "Tu aplicación ha sido aceptada. Es hora de negociar los detalles.",
-            related_application_id=application_id
+            *APPLICATION_REVIEW_MESSAGES[ApplicationStatus.ACCEPTED],
+            related_application_id=application_id,
+            commit=commit
         )
     
     @staticmethod
-    async def notify_application_rejected(db: AsyncSession, creator_id: int, application_id: int):
+    async def notify_application_rejected(db: AsyncSession, creator_id: int, application_id: int, commit: bool = True):
         """Notificar aplicación rechazada"""
         await NotificationService.create_notification(
             db,
             creator_id,
-            NotificationType.APPLICATION_REJECTED,
-            "Aplicación rechazada",
-            "Tu aplicación ha sido rechazada. Sigue intentando con otras ofertas.",
-            related_application_id=application_id
+            *APPLICATION_REVIEW_MESSAGES[ApplicationStatus.REJECTED],
+            related_application_id=application_id,
+            commit=commit
         )
     
+    @staticmethod
+    async def notify_application_reviews(db: AsyncSession, reviews: List[tuple]) -> int:
+        """
+        Notificar en bloque las revisiones de aplicaciones
+
+        `reviews` son tuplas (creator_id, application_id, status); sólo
+        ACCEPTED y REJECTED generan notificación. Un solo INSERT multi-fila;
+        no hace commit.
+        """
+        now = datetime.utcnow()
+        rows = []
+        for creator_id, application_id, application_status in reviews:
+            if application_status not in APPLICATION_REVIEW_MESSAGES:
+                continue
+            notification_type, title, content = APPLICATION_REVIEW_MESSAGES[application_status]
+            rows.append({
+                "user_id": creator_id,
+                "type": notification_type,
+                "title": title,
+                "content": content,
+                "related_application_id": application_id,
+                "is_read": False,
+                "data": {},
+                "created_at": now,
+            })
+        
+        if rows:
+            await db.execute(insert(Notification), rows)
+        return len(rows)
+    
     @staticmethod
     async def notify_collaboration_scheduled(db: AsyncSession, user_id: int, collaboration_id: int):
         """Notificar colaboración agendada"""
@@ -97,7 +149,7 @@ class NotificationService:
         )
     
     @staticmethod
-    async def notify_tier_upgraded(db: AsyncSession, creator_id: int, new_tier: int):
+    async def notify_tier_upgraded(db: AsyncSession, creator_id: int, new_tier: int, commit: bool = True):
         """Notificar ascenso de tier"""
         tier_names = ["Newbie", "Explorer", "Pro", "Elite", "Master", "Legend"]
         await NotificationService.create_notification(
@@ -106,7 +158,8 @@ class NotificationService:
             NotificationType.TIER_UPGRADED,
             f"¡Ascendiste a {tier_names[new_tier]}!",
             f"Felicidades, ahora eres nivel {tier_names[new_tier]}. Desbloquea nuevas ofertas.",
-            data={"new_tier": new_tier}
+            data={"new_tier": new_tier},
+            commit=commit
         )
     
     @staticmethod
@@ -122,3 +175,42 @@ class NotificationService:
             related_collaboration_id=collaboration_id,
             related_user_id=user_id
         )
+    
+    @staticmethod
+    async def notify_offer_closed(db, offer_ids: List[int]) -> int:
+        """
+        Notificar en bloque a los postulantes pendientes de ofertas cerradas
+
+        Un solo INSERT ... SELECT sobre applications; no hace commit.
+        """
+        if not offer_ids:
+            return 0
+        
+        table = Notification.__table__
+        now = datetime.utcnow()
+        pending = select(
+            Application.creator_id,
+            literal(NotificationType.OFFER_CLOSED, table.c.type.type),
+            literal("Oferta cerrada"),
+            literal('La oferta "') + Offer.title + literal('" cerró su periodo de postulación.'),
+            Application.offer_id,
+            Application.id,
+            Offer.business_id,
+            literal(False),
+            literal({}, table.c.data.type),
+            literal(now),
+        ).join(Offer, Offer.id == Application.offer_id).where(
+            and_(
+                Application.offer_id.in_(offer_ids),
+                Application.status.in_([ApplicationStatus.APPLIED, ApplicationStatus.UNDER_REVIEW])
+            )
+        )
+        
+        result = await db.execute(
+            insert(table).from_select(
+                ["user_id", "type", "title", "content", "related_offer_id",
+                 "related_application_id", "related_user_id", "is_read", "data", "created_at"],
+                pending
+            )
+        )
+        return result.rowcount
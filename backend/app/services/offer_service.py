@@ -1,16 +1,238 @@
 """Offer service"""
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func, update, insert, and_, or_
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import array
 from datetime import datetime
-from app.models.offer import Offer
+from typing import AsyncIterator, List, Optional, Tuple
+from pydantic import ValidationError
+import re
+from app.models.offer import Offer, OfferStatus, OfferCategory
+from app.models.collaboration import Application, ApplicationStatus
 from app.schemas.offer import OfferCreate, OfferUpdate
+from app.services.feed_cache_service import FeedCacheService
+from app.services.eligibility_service import EligibilityService
+from app.services.notification_service import NotificationService
+from app.database import AsyncSessionLocal
+from app.config import settings
+from app.utils.http_cache import make_etag
+from app.utils.geo import geohash_or_none
+from app.utils.currency import to_base, base_rate_sql
+from app.utils.pagination import keyset_order
+
+# Máximo de términos de búsqueda que se convierten en tsquery
+MAX_SEARCH_TERMS = 8
+
+# Opciones de ts_headline para los fragmentos resaltados
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+# Plataformas con contador propio en las facetas
+FACET_PLATFORMS = ("instagram", "tiktok", "youtube", "facebook")
+
+# Rangos [desde, hasta) de budget_min en las facetas
+FACET_BUDGET_BUCKETS = ((0, 100), (100, 250), (250, 500), (500, 1000), (1000, None))
+
+
+def active_offer_filter():
+    """Ofertas visibles en el feed: activas, públicas y con plazo abierto"""
+    return and_(
+        Offer.status == OfferStatus.ACTIVE,
+        Offer.is_public == True,
+        Offer.application_deadline > datetime.utcnow()
+    )
+
 
 class OfferService:
     
     @staticmethod
-    async def create_offer(db: AsyncSession, offer_data: OfferCreate, business_id: int) -> Offer:
-        """Crear nueva oferta"""
-        offer = Offer(
+    def parse_platforms(platforms: str) -> List[str]:
+        """Normalizar `instagram, TikTok` -> ["instagram", "tiktok"] (sin duplicados)"""
+        values = (p.strip().lower() for p in platforms.split(","))
+        return sorted({p for p in values if p})
+    
+    @staticmethod
+    def parse_category(category: str) -> str:
+        """
+        Normalizar `TRAVEL` / `travel` -> "travel" (OfferCategory.value)
+
+        El filtro SQL acepta tanto el nombre como el valor del enum, pero la
+        clave y el scope de la cache del feed deben ser siempre el valor,
+        que es lo que invalida FeedCacheService.invalidate.
+        """
+        try:
+            return OfferCategory(category.strip().lower()).value
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Categoría inválida: {category}"
+            )
+    
+    @staticmethod
+    def build_search_query(search: str):
+        """
+        Convertir texto libre en un tsquery con coincidencia por prefijo
+
+        Cada término se busca como prefijo (`term:*`) y todos deben aparecer.
+        Se combinan las configuraciones española e inglesa, igual que
+        `Offer.search_vector`. Devuelve None si no queda ningún término.
+        """
+        terms = re.findall(r"[^\W_]+", search.lower())[:MAX_SEARCH_TERMS]
+        if not terms:
+            return None
+        
+        expression = " & ".join(f"{term}:*" for term in terms)
+        return func.to_tsquery("spanish", expression).op("||")(
+            func.to_tsquery("english", expression)
+        )
+    
+    @staticmethod
+    def search_headline(ts_query):
+        """Fragmento de la descripción con los términos encontrados resaltados"""
+        return func.ts_headline("spanish", Offer.description, ts_query, SEARCH_HEADLINE_OPTIONS)
+    
+    @staticmethod
+    def list_filters(
+        category: Optional[str] = None,
+        platforms: Optional[List[str]] = None,
+        platforms_match: str = "any",
+        budget_min: Optional[float] = None,
+        budget_max: Optional[float] = None,
+        ts_query=None
+    ) -> dict:
+        """
+        Predicados de los filtros de `list_offers`, por nombre de filtro
+
+        Sólo incluye los filtros presentes. Se devuelven por separado para que
+        las facetas puedan excluir el filtro de su propia dimensión.
+        """
+        filters = {}
+        if category:
+            filters["category"] = Offer.category == category
+        
+        budget = []
+        if budget_min:
+            budget.append(Offer.budget_min >= budget_min)
+        if budget_max:
+            budget.append(Offer.budget_max <= budget_max)
+        if budget:
+            filters["budget"] = and_(*budget)
+        
+        if platforms:
+            if platforms_match == "all":
+                filters["platforms"] = Offer.platforms.contains(platforms)
+            else:
+                filters["platforms"] = Offer.platforms.has_any(array(platforms))
+        
+        if ts_query is not None:
+            filters["search"] = Offer.search_vector.op("@@")(ts_query)
+        return filters
+    
+    @staticmethod
+    async def get_facets(db: AsyncSession, base_filter, filters: dict) -> dict:
+        """
+        Contadores por categoría, plataforma y rango de presupuesto
+
+        Todo sale de un único SELECT con agregados `count(*) FILTER (...)`,
+        así que es una sola pasada sobre las ofertas que cumplen `base_filter`
+        y la búsqueda. Cada faceta aplica el resto de filtros pero no el suyo
+        (al elegir una categoría se siguen viendo los contadores de las demás).
+        """
+        def count(*conditions, exclude: Optional[str] = None):
+            conditions = [c for name, c in filters.items() if name not in (exclude, "search")] + list(conditions)
+            return func.count().filter(and_(*conditions)) if conditions else func.count()
+        
+        columns = [count().label("total")]
+        columns += [
+            count(Offer.category == category, exclude="category").label(f"category_{category.value}")
+            for category in OfferCategory
+        ]
+        columns += [
+            count(Offer.platforms.has_key(platform), exclude="platforms").label(f"platform_{platform}")
+            for platform in FACET_PLATFORMS
+        ]
+        for index, (low, high) in enumerate(FACET_BUDGET_BUCKETS):
+            bucket = [Offer.budget_min >= low]
+            if high is not None:
+                bucket.append(Offer.budget_min < high)
+            columns.append(count(*bucket, exclude="budget").label(f"budget_{index}"))
+        
+        query = select(*columns).select_from(Offer).where(base_filter)
+        if "search" in filters:
+            query = query.where(filters["search"])
+        
+        row = (await db.execute(query)).one()._mapping
+        return {
+            "total": row["total"],
+            "categories": {c.value: row[f"category_{c.value}"] for c in OfferCategory},
+            "platforms": {p: row[f"platform_{p}"] for p in FACET_PLATFORMS},
+            "budget": [
+                {"min": low, "max": high, "count": row[f"budget_{index}"]}
+                for index, (low, high) in enumerate(FACET_BUDGET_BUCKETS)
+            ],
+        }
+    
+    @staticmethod
+    async def business_offers_page(
+        db: AsyncSession,
+        columns: list,
+        conditions: list,
+        limit: int
+    ) -> Tuple[list, List[dict]]:
+        """
+        Página de ofertas de una empresa con sus aplicaciones por estado
+
+        Una sola consulta: la página (por `created_at DESC, id DESC`) va en
+        una CTE y se une con un único GROUP BY sobre las aplicaciones de esas
+        ofertas, en lugar de contar oferta por oferta. Devuelve las filas
+        (hasta `limit`) y los contadores de cada una en el mismo orden.
+        """
+        page = (
+            select(*columns)
+            .where(*conditions)
+            .order_by(*keyset_order(Offer.created_at, Offer.id))
+            .limit(limit)
+            .cte("page")
+        )
+        stats = (
+            select(
+                Application.offer_id,
+                *(
+                    func.count().filter(Application.status == application_status).label(application_status.value)
+                    for application_status in ApplicationStatus
+                )
+            )
+            .where(Application.offer_id.in_(select(page.c.id)))
+            .group_by(Application.offer_id)
+            .subquery("stats")
+        )
+        query = (
+            select(
+                page,
+                *(
+                    func.coalesce(stats.c[application_status.value], 0).label(f"stats_{application_status.value}")
+                    for application_status in ApplicationStatus
+                )
+            )
+            .select_from(page.outerjoin(stats, stats.c.offer_id == page.c.id))
+            .order_by(*keyset_order(page.c.created_at, page.c.id))
+        )
+
+        rows = (await db.execute(query)).all()
+        counts = [
+            {s.value: row._mapping[f"stats_{s.value}"] for s in ApplicationStatus}
+            for row in rows
+        ]
+        return rows, counts
+    
+    @staticmethod
+    def offer_values(offer_data: OfferCreate, business_id: int) -> dict:
+        """Columnas de una oferta nueva (en borrador) a partir de OfferCreate"""
+        requirements = {
+            "influencer": offer_data.influencer_requirements.dict(),
+            "regular": offer_data.regular_creator_requirements.dict()
+        }
+        return dict(
             business_id=business_id,
             title=offer_data.title,
             description=offer_data.description,
@@ -18,37 +240,269 @@ class OfferService:
             budget_min=offer_data.budget_min,
             budget_max=offer_data.budget_max,
             currency=offer_data.currency,
+            payout_base=to_base(
+                offer_data.budget_max if offer_data.budget_max is not None else offer_data.budget_min,
+                offer_data.currency
+            ),
             payment_terms=offer_data.payment_terms,
-            requirements={
-                "influencer": offer_data.influencer_requirements.dict(),
-                "regular": offer_data.regular_creator_requirements.dict()
-            },
+            requirements=requirements,
+            **EligibilityService.requirement_columns(requirements),
             content_specs=offer_data.content_specs.dict(),
             deliverables=offer_data.deliverables or {},
             application_deadline=offer_data.application_deadline,
             content_deadline=offer_data.content_deadline,
             platforms=offer_data.platforms,
-            status="draft",
+            latitude=offer_data.latitude,
+            longitude=offer_data.longitude,
+            geohash=geohash_or_none(offer_data.latitude, offer_data.longitude),
+            status=OfferStatus.DRAFT,
             is_public=False
         )
+    
+    @staticmethod
+    async def create_offer(db: AsyncSession, offer_data: OfferCreate, business_id: int) -> Offer:
+        """Crear nueva oferta"""
+        offer = Offer(**OfferService.offer_values(offer_data, business_id))
         
         db.add(offer)
         await db.commit()
         await db.refresh(offer)
         return offer
     
+    @staticmethod
+    async def _insert_chunk(db: AsyncSession, chunk: List[Tuple[int, dict]], result: dict):
+        """Insertar un lote en una transacción con INSERT multi-fila ... RETURNING id"""
+        now = datetime.utcnow()
+        rows = [{**values, "created_at": now, "updated_at": now} for _, values in chunk]
+        try:
+            # insertmanyvalues: VALUES (...), (...) con los ids en el orden de `rows`
+            ids = (await db.execute(
+                insert(Offer).returning(Offer.id, sort_by_parameter_order=True), rows
+            )).scalars().all()
+            await db.commit()
+        except DBAPIError:
+            await db.rollback()
+        else:
+            result["created"].extend({"index": index, "id": id} for (index, _), id in zip(chunk, ids))
+            return
+        
+        # El lote falló entero: reintentar fila a fila para aislar las que fallan
+        for (index, _), row in zip(chunk, rows):
+            try:
+                async with db.begin_nested():
+                    id = await db.scalar(insert(Offer).values(**row).returning(Offer.id))
+                result["created"].append({"index": index, "id": id})
+            except DBAPIError as e:
+                result["errors"].append({"index": index, "errors": [str(e.orig)]})
+        await db.commit()
+    
+    @staticmethod
+    async def bulk_create_offers(db: AsyncSession, items: AsyncIterator, business_id: int) -> dict:
+        """
+        Crear ofertas en borrador a partir de un flujo de elementos JSON
+
+        `items` es un iterador de `(valor, error)` (ver `iter_json_values`).
+        Cada elemento se valida con OfferCreate en cuanto llega y los válidos
+        se insertan en lotes de BULK_OFFERS_CHUNK_SIZE, un INSERT multi-fila y
+        una transacción por lote. Los errores se devuelven por índice sin
+        interrumpir el resto de la importación.
+        """
+        result = {"created": [], "errors": []}
+        chunk = []
+        index = -1
+        
+        async for value, error in items:
+            index += 1
+            if index >= settings.BULK_OFFERS_MAX_ITEMS:
+                result["errors"].append({
+                    "index": index,
+                    "errors": [f"Máximo {settings.BULK_OFFERS_MAX_ITEMS} ofertas por importación"]
+                })
+                break
+            if error is not None:
+                result["errors"].append({"index": index, "errors": [error]})
+                continue
+            if not isinstance(value, dict):
+                result["errors"].append({"index": index, "errors": ["Cada elemento debe ser un objeto"]})
+                continue
+            
+            try:
+                offer_data = OfferCreate(**value)
+            except ValidationError as e:
+                result["errors"].append({
+                    "index": index,
+                    "errors": e.errors(include_url=False, include_context=False)
+                })
+                continue
+            
+            chunk.append((index, OfferService.offer_values(offer_data, business_id)))
+            if len(chunk) >= settings.BULK_OFFERS_CHUNK_SIZE:
+                await OfferService._insert_chunk(db, chunk, result)
+                chunk = []
+        
+        if chunk:
+            await OfferService._insert_chunk(db, chunk, result)
+        return result
+    
     @staticmethod
     async def get_offer_by_id(db: AsyncSession, offer_id: int) -> Offer:
         """Obtener oferta por ID"""
         return await db.get(Offer, offer_id)
     
+    @staticmethod
+    async def get_offer_version(db: AsyncSession, offer_id: int):
+        """Columnas de visibilidad y versión de una oferta, sin cargar la entidad"""
+        result = await db.execute(
+            select(
+                Offer.id, Offer.business_id, Offer.status, Offer.is_public,
+                Offer.updated_at, Offer.views_count, Offer.applications_count, Offer.accepted_count
+            ).where(Offer.id == offer_id)
+        )
+        return result.first()
+    
+    @staticmethod
+    def offer_etag(offer) -> str:
+        """ETag de una oferta (entidad o fila de get_offer_version)"""
+        # Los contadores cambian sin tocar updated_at, pero forman parte del cuerpo
+        return make_etag(
+            "offer", offer.id, offer.updated_at,
+            offer.views_count, offer.applications_count, offer.accepted_count
+        )
+    
     @staticmethod
     async def update_offer(db: AsyncSession, offer: Offer, offer_data: OfferUpdate) -> Offer:
         """Actualizar oferta"""
-        for field, value in offer_data.dict(exclude_unset=True).items():
+        was_listed = offer.status == OfferStatus.ACTIVE and offer.is_public
+        previous_category = offer.category
+        
+        changes = offer_data.dict(exclude_unset=True)
+        for field, value in changes.items():
             setattr(offer, field, value)
+        if "latitude" in changes or "longitude" in changes:
+            offer.geohash = geohash_or_none(offer.latitude, offer.longitude)
+        if "budget_min" in changes or "budget_max" in changes:
+            offer.payout_base = to_base(
+                offer.budget_max if offer.budget_max is not None else offer.budget_min, offer.currency
+            )
         
         offer.updated_at = datetime.utcnow()
         await db.commit()
         await db.refresh(offer)
+        
+        if was_listed or (offer.status == OfferStatus.ACTIVE and offer.is_public):
+            await FeedCacheService.invalidate(previous_category, offer.category)
         return offer
+    
+    @staticmethod
+    async def close_expired_offers() -> int:
+        """
+        Pasar a CLOSED las ofertas activas con application_deadline vencido
+
+        Trabaja en lotes de OFFER_CLOSE_BATCH_SIZE (un UPDATE ... RETURNING y
+        un INSERT de notificaciones por lote, con commit por lote). Pensado
+        para ejecutarse desde el Scheduler, que garantiza un solo worker.
+        """
+        total = 0
+        categories = set()
+        
+        while True:
+            now = datetime.utcnow()
+            expired = (
+                select(Offer.id)
+                .where(Offer.status == OfferStatus.ACTIVE, Offer.application_deadline <= now)
+                .order_by(Offer.application_deadline)
+                .limit(settings.OFFER_CLOSE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    update(Offer)
+                    .where(Offer.id.in_(expired))
+                    .values(status=OfferStatus.CLOSED, updated_at=now)
+                    .returning(Offer.id, Offer.category)
+                    .execution_options(synchronize_session=False)
+                )
+                closed = result.all()
+                if not closed:
+                    break
+                
+                await NotificationService.notify_offer_closed(db, [row.id for row in closed])
+                await db.commit()
+            
+            total += len(closed)
+            categories.update(row.category for row in closed)
+            if len(closed) < settings.OFFER_CLOSE_BATCH_SIZE:
+                break
+        
+        if categories:
+            await FeedCacheService.invalidate(*categories)
+        return total
+    
+    @staticmethod
+    async def reconcile_application_counters() -> int:
+        """
+        Corregir applications_count / accepted_count que se hayan desviado
+
+        Recalcula ambos contadores desde `applications` con un único GROUP BY
+        y sólo escribe las ofertas cuyo valor no coincide. Devuelve el número
+        de ofertas corregidas.
+        """
+        counts = (
+            select(
+                Application.offer_id,
+                func.count().label("applications"),
+                func.count().filter(Application.status == ApplicationStatus.ACCEPTED).label("accepted"),
+            )
+            .group_by(Application.offer_id)
+            .subquery()
+        )
+        
+        async with AsyncSessionLocal() as db:
+            with_applications = await db.execute(
+                update(Offer)
+                .where(
+                    Offer.id == counts.c.offer_id,
+                    or_(
+                        Offer.applications_count.is_distinct_from(counts.c.applications),
+                        Offer.accepted_count.is_distinct_from(counts.c.accepted),
+                    )
+                )
+                .values(
+                    applications_count=counts.c.applications,
+                    accepted_count=counts.c.accepted,
+                    updated_at=Offer.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            without_applications = await db.execute(
+                update(Offer)
+                .where(
+                    or_(Offer.applications_count.is_distinct_from(0), Offer.accepted_count.is_distinct_from(0)),
+                    ~select(Application.id).where(Application.offer_id == Offer.id).exists()
+                )
+                .values(applications_count=0, accepted_count=0, updated_at=Offer.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        
+        return with_applications.rowcount + without_applications.rowcount
+    
+    @staticmethod
+    async def sync_payouts(db: AsyncSession) -> int:
+        """
+        Recalcular payout_base donde no coincida con las tasas configuradas
+
+        Un único UPDATE set-based; cubre ofertas anteriores a la columna y
+        cambios en CURRENCY_RATES.
+        """
+        payout = func.coalesce(Offer.budget_max, Offer.budget_min) * base_rate_sql(Offer.currency)
+        result = await db.execute(
+            update(Offer)
+            .where(Offer.payout_base.is_distinct_from(payout))
+            .values(payout_base=payout, updated_at=Offer.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
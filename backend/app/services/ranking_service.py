@@ -0,0 +1,335 @@
+"""Personalized offer ranking for creators"""
+import asyncio
+import math
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Profile
+from app.models.collaboration import Application
+from app.models.offer import Offer, OfferCategory
+from app.services.eligibility_service import INFLUENCER_MIN_FOLLOWERS
+from app.services.offer_service import active_offer_filter
+from app.services.trending_service import TRENDING_EPOCH
+
+# Peso de cada señal en el score personalizado
+RANKING_WEIGHTS = {
+    "eligible": 4.0,          # cumple los requisitos de la oferta
+    "category": 1.5,          # la categoría está entre las del perfil
+    "history": 2.0,           # proporción de sus aplicaciones en esa categoría
+    "country": 0.5,           # la oferta pide su país
+    "follower_fit": 0.5,      # margen de seguidores sobre el mínimo
+    "payout": 0.5,            # pago relativo; se multiplica por (1 + tier / 2)
+    "trending": 1.0,
+    "freshness": 0.75,        # decae con vida media RANKING_FRESHNESS_HOURS
+}
+
+RANKING_FRESHNESS_HOURS = 72.0
+
+# Bits disponibles para categorías (máscaras int64); el resto comparte el último
+MAX_CATEGORY_BITS = 63
+
+PLATFORM_BITS = {"instagram": 1, "tiktok": 2, "youtube": 4, "facebook": 8}
+
+_EPOCH_SECONDS = TRENDING_EPOCH.timestamp()
+
+
+def _nan(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+class CandidateMatrix:
+    """
+    Ofertas activas en formato columnar (un array NumPy por atributo)
+
+    Se construye una vez por refresco; las listas JSON (plataformas,
+    categorías requeridas / excluidas) se convierten en máscaras de bits y
+    los textos (país, categoría) en enteros, de modo que puntuar a un
+    creador son operaciones vectorizadas sobre arrays de N elementos.
+    """
+
+    def __init__(self, rows: Sequence, built_at: Optional[float] = None):
+        self.built_at = built_at or time.time()
+        n = len(rows)
+
+        self.category_index = {category.value: i for i, category in enumerate(OfferCategory)}
+        self.category_bits: Dict[str, int] = {}
+        self.country_codes: Dict[str, int] = {}
+
+        self.ids = np.empty(n, dtype=np.int64)
+        self.category = np.empty(n, dtype=np.int16)
+        self.platforms = np.zeros(n, dtype=np.int64)
+        self.req_min = np.empty(n, dtype=np.float64)
+        self.req_max = np.empty(n, dtype=np.float64)
+        self.req_regular_min = np.empty(n, dtype=np.float64)
+        self.req_verified = np.zeros(n, dtype=bool)
+        self.req_country = np.zeros(n, dtype=np.int32)
+        self.req_categories = np.zeros(n, dtype=np.int64)
+        self.excluded_categories = np.zeros(n, dtype=np.int64)
+        self.budget_min = np.empty(n, dtype=np.float64)
+        self.budget_max = np.empty(n, dtype=np.float64)
+        payout = np.empty(n, dtype=np.float64)
+        trending = np.empty(n, dtype=np.float64)
+        self.published_hours = np.empty(n, dtype=np.float64)
+
+        for i, row in enumerate(rows):
+            self.ids[i] = row.id
+            self.category[i] = self.category_index.get(getattr(row.category, "value", row.category), -1)
+            for platform in row.platforms or []:
+                self.platforms[i] |= PLATFORM_BITS.get(platform, 0)
+            self.req_min[i] = _nan(row.req_min_followers)
+            self.req_max[i] = _nan(row.req_max_followers)
+            self.req_regular_min[i] = _nan(row.req_regular_min_followers)
+            self.req_verified[i] = bool(row.req_verified_required)
+            if row.req_country:
+                self.req_country[i] = self.country_codes.setdefault(row.req_country, len(self.country_codes) + 1)
+            self.req_categories[i] = self.categories_mask(row.req_categories or [], create=True)
+            self.excluded_categories[i] = self.categories_mask(row.req_excluded_categories or [], create=True)
+            self.budget_min[i] = _nan(row.budget_min)
+            self.budget_max[i] = _nan(row.budget_max)
+            payout[i] = _nan(row.payout_base)
+            trending[i] = _nan(row.trending_score)
+            published = row.published_at.timestamp() if row.published_at else np.nan
+            self.published_hours[i] = (published - _EPOCH_SECONDS) / 3600
+
+        # Normalizaciones globales a [0, 1], independientes del creador
+        self.payout_norm = self._rank_normalize(np.log1p(payout))
+        self.trending_norm = self._rank_normalize(trending)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def categories_mask(self, categories: Iterable[str], create: bool = False) -> int:
+        mask = 0
+        for category in categories:
+            bit = self.category_bits.get(category)
+            if bit is None:
+                if not create:
+                    continue
+                bit = self.category_bits[category] = min(len(self.category_bits), MAX_CATEGORY_BITS - 1)
+            mask |= 1 << bit
+        return mask
+
+    @staticmethod
+    def _rank_normalize(values: np.ndarray) -> np.ndarray:
+        """Percentil de cada valor (NaN -> 0)"""
+        result = np.zeros(len(values), dtype=np.float64)
+        present = ~np.isnan(values)
+        count = int(present.sum())
+        if count > 1:
+            order = values[present].argsort().argsort()
+            result[present] = order / (count - 1)
+        elif count == 1:
+            result[present] = 1.0
+        return result
+
+
+class CreatorFeatures:
+    """Atributos del creador y su historial de aplicaciones"""
+
+    def __init__(self, profile, applied: Sequence[Tuple[int, object]]):
+        self.followers = max(profile.instagram_followers or 0, profile.tiktok_followers or 0)
+        self.verified = bool(profile.instagram_verified or profile.tiktok_verified)
+        self.country = profile.country
+        self.categories = list(profile.categories or [])
+        self.tier = profile.tier_level or 0
+        self.applied_ids = np.fromiter((offer_id for offer_id, _ in applied), dtype=np.int64, count=len(applied))
+        self.applied_categories = [getattr(category, "value", category) for _, category in applied]
+
+
+class RankingService:
+    """
+    Ranking personalizado del feed (`sort_by=for_you`)
+
+    Cada worker mantiene en memoria la matriz de candidatos (ofertas activas)
+    y la refresca cada RANKING_SNAPSHOT_SECONDS. Por petición sólo se leen
+    el perfil y el historial del creador y se puntúan todas las candidatas
+    con operaciones NumPy; la página se carga después por id.
+    """
+
+    _matrix: Optional[CandidateMatrix] = None
+    _lock = asyncio.Lock()
+
+    @staticmethod
+    def candidates_query():
+        return select(
+            Offer.id, Offer.category, Offer.platforms,
+            Offer.req_min_followers, Offer.req_max_followers, Offer.req_regular_min_followers,
+            Offer.req_verified_required, Offer.req_country,
+            Offer.req_categories, Offer.req_excluded_categories,
+            Offer.budget_min, Offer.budget_max, Offer.payout_base,
+            Offer.trending_score, Offer.published_at,
+        ).where(active_offer_filter())
+
+    @classmethod
+    async def refresh(cls) -> int:
+        """Recargar la matriz de candidatos; devuelve el número de ofertas"""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(cls.candidates_query())).all()
+        cls._matrix = CandidateMatrix(rows)
+        return len(rows)
+
+    @classmethod
+    async def get_matrix(cls) -> CandidateMatrix:
+        matrix = cls._matrix
+        if matrix is None or time.time() - matrix.built_at > settings.RANKING_SNAPSHOT_SECONDS * 2:
+            # Sin refresco reciente del Scheduler (p. ej. recién arrancado)
+            async with cls._lock:
+                if cls._matrix is matrix:
+                    await cls.refresh()
+            matrix = cls._matrix
+        return matrix
+
+    @staticmethod
+    async def creator_features(db: AsyncSession, user_id: int) -> Optional[CreatorFeatures]:
+        profile = await db.scalar(select(Profile).where(Profile.user_id == user_id))
+        if profile is None:
+            return None
+        applied = (await db.execute(
+            select(Application.offer_id, Offer.category)
+            .join(Offer, Offer.id == Application.offer_id)
+            .where(Application.creator_id == user_id)
+        )).all()
+        return CreatorFeatures(profile, applied)
+
+    @staticmethod
+    def eligibility(matrix: CandidateMatrix, creator: CreatorFeatures) -> np.ndarray:
+        """Versión vectorizada de EligibilityService.offers_for_profile"""
+        followers = creator.followers
+        with np.errstate(invalid="ignore"):
+            if followers < INFLUENCER_MIN_FOLLOWERS:
+                return matrix.req_regular_min <= followers
+
+            eligible = matrix.req_min <= followers
+            eligible &= np.isnan(matrix.req_max) | (matrix.req_max >= followers)
+
+        country = matrix.country_codes.get(creator.country, -1)
+        eligible &= (matrix.req_country == 0) | (matrix.req_country == country)
+        if not creator.verified:
+            eligible &= ~matrix.req_verified
+
+        profile_mask = matrix.categories_mask(creator.categories)
+        if creator.categories:
+            eligible &= (matrix.req_categories == 0) | ((matrix.req_categories & profile_mask) != 0)
+            eligible &= (matrix.excluded_categories & profile_mask) == 0
+        else:
+            eligible &= matrix.req_categories == 0
+        return eligible
+
+    @staticmethod
+    def filter_mask(
+        matrix: CandidateMatrix,
+        category: Optional[str] = None,
+        platforms: Optional[List[str]] = None,
+        platforms_match: str = "any",
+        budget_min: Optional[float] = None,
+        budget_max: Optional[float] = None
+    ) -> np.ndarray:
+        """Los filtros de `list_offers` aplicados sobre la matriz"""
+        mask = np.ones(len(matrix), dtype=bool)
+        if category:
+            mask &= matrix.category == matrix.category_index.get(category, -2)
+        if platforms:
+            wanted = 0
+            for platform in platforms:
+                wanted |= PLATFORM_BITS.get(platform, 0)
+            if platforms_match == "all":
+                # Plataformas sin bit propio no pueden cumplirse
+                if any(platform not in PLATFORM_BITS for platform in platforms):
+                    return np.zeros(len(matrix), dtype=bool)
+                mask &= (matrix.platforms & wanted) == wanted
+            else:
+                mask &= (matrix.platforms & wanted) != 0
+        with np.errstate(invalid="ignore"):
+            if budget_min:
+                mask &= matrix.budget_min >= budget_min
+            if budget_max:
+                mask &= matrix.budget_max <= budget_max
+        return mask
+
+    @staticmethod
+    def score(matrix: CandidateMatrix, creator: CreatorFeatures, now: Optional[datetime] = None) -> np.ndarray:
+        """Score de todas las candidatas para un creador (-inf = descartada)"""
+        w = RANKING_WEIGHTS
+        eligible = RankingService.eligibility(matrix, creator)
+
+        category_count = len(matrix.category_index)
+        profile_categories = np.zeros(category_count + 1, dtype=np.float64)
+        for category in creator.categories:
+            if category in matrix.category_index:
+                profile_categories[matrix.category_index[category]] = 1.0
+
+        history = np.zeros(category_count + 1, dtype=np.float64)
+        for category in creator.applied_categories:
+            history[matrix.category_index.get(category, category_count)] += 1
+        if creator.applied_categories:
+            history /= len(creator.applied_categories)
+
+        # Las categorías desconocidas (-1) caen en la última posición, siempre 0
+        category = np.where(matrix.category >= 0, matrix.category, category_count)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            follower_fit = np.clip(np.log10(creator.followers / matrix.req_min), 0.0, 1.0)
+        follower_fit = np.nan_to_num(follower_fit, nan=0.0)
+
+        now_hours = ((now or datetime.utcnow()).timestamp() - _EPOCH_SECONDS) / 3600
+        age = np.nan_to_num(now_hours - matrix.published_hours, nan=10 * RANKING_FRESHNESS_HOURS)
+        freshness = np.exp2(-np.maximum(age, 0.0) / RANKING_FRESHNESS_HOURS)
+
+        country = matrix.country_codes.get(creator.country, -1)
+
+        scores = (
+            w["eligible"] * eligible
+            + w["category"] * profile_categories[category]
+            + w["history"] * history[category]
+            + w["country"] * (matrix.req_country == country)
+            + w["follower_fit"] * follower_fit * eligible
+            + w["payout"] * (1 + creator.tier / 2) * matrix.payout_norm
+            + w["trending"] * matrix.trending_norm
+            + w["freshness"] * freshness
+        )
+
+        # Las ofertas a las que ya aplicó no se vuelven a mostrar
+        if len(creator.applied_ids):
+            scores[np.isin(matrix.ids, creator.applied_ids)] = -np.inf
+        return scores
+
+    @staticmethod
+    def top(matrix: CandidateMatrix, scores: np.ndarray, offset: int, limit: int) -> Tuple[List[int], bool]:
+        """Ids de las posiciones [offset, offset + limit) y si hay más"""
+        valid = np.flatnonzero(np.isfinite(scores))
+        wanted = offset + limit + 1
+        if wanted < len(valid):
+            # Sólo se ordenan las `wanted` mejores (O(N) + O(k log k))
+            best = valid[np.argpartition(-scores[valid], wanted - 1)[:wanted]]
+        else:
+            best = valid
+        # Orden estable por score descendente y, a igualdad, id descendente
+        best = best[np.lexsort((-matrix.ids[best], -scores[best]))]
+        page = best[offset:offset + limit]
+        return matrix.ids[page].tolist(), len(best) > offset + limit
+
+    @classmethod
+    async def rank(
+        cls,
+        db: AsyncSession,
+        user_id: int,
+        offset: int,
+        limit: int,
+        **filters
+    ) -> Tuple[List[int], bool]:
+        """Página del feed personalizado: (ids en orden, hay más)"""
+        matrix = await cls.get_matrix()
+        creator = await cls.creator_features(db, user_id)
+        if creator is None or not len(matrix):
+            return [], False
+
+        scores = cls.score(matrix, creator)
+        scores[~cls.filter_mask(matrix, **filters)] = -np.inf
+        return cls.top(matrix, scores, offset, limit)
@@ -0,0 +1,229 @@
+"""Profile rating, completion rate and response time"""
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import select, update, func, case, literal, or_, union_all, Float, Integer, cast
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Profile
+from app.models.collaboration import Application, Collaboration, CollaborationStatus
+from app.models.offer import Offer
+
+
+def _ratio(numerator, denominator, scale: float = 1.0):
+    """numerator * scale / denominator, NULL si denominator es 0"""
+    return numerator * literal(scale, Float) / func.nullif(denominator, 0)
+
+
+class ReputationService:
+    """
+    Rating, tasa de completado y tiempo de respuesta de los perfiles
+
+    Profile guarda acumulados (rating_sum / rating_count,
+    collaborations_started / collaborations_finished, response_hours_total /
+    response_count) que se ajustan con un UPDATE atómico (x = x + n) dentro de
+    la transacción del evento, junto con el cociente visible (rating,
+    completion_rate, response_time): leer un perfil no cuenta colaboraciones
+    ni aplicaciones.
+
+    En perfiles anteriores a estas columnas los acumulados son NULL; los
+    UPDATE incrementales los dejan en NULL (y el valor visible como estaba)
+    hasta que `backfill` los calcula en bloque. Ningún método hace commit
+    salvo `backfill`.
+    """
+
+    @staticmethod
+    async def record_rating(db: AsyncSession, user_id: int, rating: float, previous: float = None):
+        """Sumar (o corregir, si ya había `previous`) una calificación recibida por `user_id`"""
+        rating_sum = Profile.rating_sum + (rating - (previous or 0))
+        rating_count = func.coalesce(Profile.rating_count, 0) + (1 if previous is None else 0)
+        await db.execute(
+            update(Profile)
+            .where(Profile.user_id == user_id)
+            .values(
+                rating_sum=rating_sum,
+                rating_count=rating_count,
+                rating=func.coalesce(_ratio(rating_sum, rating_count), Profile.rating),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def record_started(db: AsyncSession, counts: Dict[int, int]):
+        """Sumar colaboraciones iniciadas: {user_id: n}"""
+        if not counts:
+            return
+        started = Profile.collaborations_started + case(counts, value=Profile.user_id, else_=0)
+        await db.execute(
+            update(Profile)
+            .where(Profile.user_id.in_(list(counts)))
+            .values(
+                collaborations_started=started,
+                completion_rate=func.coalesce(
+                    _ratio(Profile.collaborations_finished, started, 100.0), Profile.completion_rate
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def record_finished(db: AsyncSession, user_ids: List[int]):
+        """Sumar una colaboración completada a cada usuario (creador y business)"""
+        finished = Profile.collaborations_finished + 1
+        await db.execute(
+            update(Profile)
+            .where(Profile.user_id.in_(user_ids))
+            .values(
+                collaborations_finished=finished,
+                completion_rate=func.coalesce(
+                    _ratio(finished, Profile.collaborations_started, 100.0), Profile.completion_rate
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def record_responses(db: AsyncSession, business_id: int, hours: List[float]):
+        """
+        Sumar primeras respuestas del business a aplicaciones
+
+        `hours` son las horas entre applied_at y la primera respuesta de cada
+        aplicación; volver a revisar una aplicación ya respondida no cuenta.
+        """
+        if not hours:
+            return
+        total = Profile.response_hours_total + sum(hours)
+        count = Profile.response_count + len(hours)
+        await db.execute(
+            update(Profile)
+            .where(Profile.user_id == business_id)
+            .values(
+                response_hours_total=total,
+                response_count=count,
+                response_time=func.coalesce(cast(func.round(_ratio(total, count)), Integer), Profile.response_time),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def backfill(db: AsyncSession, full: bool = False) -> int:
+        """
+        Calcular los acumulados de los perfiles que aún no los tienen
+
+        Un GROUP BY por fuente (calificaciones, colaboraciones por rol y
+        respuestas del business) y un único UPDATE ... FROM. Con `full=True`
+        se recalculan todos los perfiles, pero sólo se escriben los que
+        cambian. updated_at (parte del ETag de GET /users/{id}) avanza sólo
+        si cambia algún valor visible. Devuelve el número de perfiles
+        actualizados.
+        """
+        if not full:
+            pending = await db.scalar(select(select(Profile.id).where(Profile.rating_sum.is_(None)).exists()))
+            if not pending:
+                return 0
+
+        # creator_rating la da el creador al business y business_rating al revés
+        received = union_all(
+            select(Collaboration.business_id.label("user_id"), Collaboration.creator_rating.label("rating"))
+            .where(Collaboration.creator_rating.isnot(None)),
+            select(Collaboration.creator_id.label("user_id"), Collaboration.business_rating.label("rating"))
+            .where(Collaboration.business_rating.isnot(None)),
+        ).subquery()
+        ratings = (
+            select(
+                received.c.user_id,
+                func.sum(received.c.rating).label("total"),
+                func.count().label("count"),
+            )
+            .group_by(received.c.user_id)
+            .subquery()
+        )
+
+        parties = union_all(
+            select(Collaboration.creator_id.label("user_id"), Collaboration.status),
+            select(Collaboration.business_id.label("user_id"), Collaboration.status)
+            .where(Collaboration.business_id != Collaboration.creator_id),
+        ).subquery()
+        collaborations = (
+            select(
+                parties.c.user_id,
+                func.count().label("started"),
+                func.count().filter(parties.c.status == CollaborationStatus.COMPLETED).label("finished"),
+            )
+            .group_by(parties.c.user_id)
+            .subquery()
+        )
+
+        responses = (
+            select(
+                Offer.business_id.label("user_id"),
+                func.sum(func.extract("epoch", Application.responded_at - Application.applied_at) / 3600).label("hours"),
+                func.count().label("count"),
+            )
+            .join(Offer, Offer.id == Application.offer_id)
+            .where(Application.responded_at.isnot(None))
+            .group_by(Offer.business_id)
+            .subquery()
+        )
+
+        rating_sum = func.coalesce(ratings.c.total, 0.0)
+        rating_count = func.coalesce(ratings.c.count, 0)
+        started = func.coalesce(collaborations.c.started, 0)
+        finished = func.coalesce(collaborations.c.finished, 0)
+        hours = func.coalesce(responses.c.hours, 0.0)
+        response_count = func.coalesce(responses.c.count, 0)
+        stats = (
+            select(
+                Profile.id,
+                rating_sum.label("rating_sum"),
+                rating_count.label("rating_count"),
+                func.coalesce(_ratio(rating_sum, rating_count), 0.0).label("rating"),
+                started.label("started"),
+                finished.label("finished"),
+                func.coalesce(_ratio(finished, started, 100.0), 0.0).label("completion_rate"),
+                hours.label("hours"),
+                response_count.label("response_count"),
+                func.coalesce(cast(func.round(_ratio(hours, response_count)), Integer), 0).label("response_time"),
+            )
+            .outerjoin(ratings, ratings.c.user_id == Profile.user_id)
+            .outerjoin(collaborations, collaborations.c.user_id == Profile.user_id)
+            .outerjoin(responses, responses.c.user_id == Profile.user_id)
+        )
+        if not full:
+            stats = stats.where(Profile.rating_sum.is_(None))
+        stats = stats.subquery()
+
+        visible = or_(
+            Profile.rating.is_distinct_from(stats.c.rating),
+            Profile.rating_count.is_distinct_from(stats.c.rating_count),
+            Profile.completion_rate.is_distinct_from(stats.c.completion_rate),
+            Profile.response_time.is_distinct_from(stats.c.response_time),
+        )
+        changed = or_(
+            visible,
+            Profile.rating_sum.is_distinct_from(stats.c.rating_sum),
+            Profile.collaborations_started.is_distinct_from(stats.c.started),
+            Profile.collaborations_finished.is_distinct_from(stats.c.finished),
+            Profile.response_hours_total.is_distinct_from(stats.c.hours),
+            Profile.response_count.is_distinct_from(stats.c.response_count),
+        )
+
+        result = await db.execute(
+            update(Profile)
+            .where(Profile.id == stats.c.id, changed)
+            .values(
+                rating_sum=stats.c.rating_sum,
+                rating_count=stats.c.rating_count,
+                rating=stats.c.rating,
+                collaborations_started=stats.c.started,
+                collaborations_finished=stats.c.finished,
+                completion_rate=stats.c.completion_rate,
+                response_hours_total=stats.c.hours,
+                response_count=stats.c.response_count,
+                response_time=stats.c.response_time,
+                updated_at=case((visible, datetime.utcnow()), else_=Profile.updated_at),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
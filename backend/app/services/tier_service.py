@@ -0,0 +1,160 @@
+"""Creator tier and karma"""
+from bisect import bisect_left
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, update, func, case, literal, or_, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Profile
+from app.models.collaboration import Collaboration, CollaborationStatus
+
+
+class TierRule(NamedTuple):
+    """Tramo (floor, ceiling] de colaboraciones completadas de un tier"""
+    tier: int
+    floor: int
+    ceiling: Optional[int]  # None = sin tope (último tier)
+    karma_base: int
+    karma_step: int  # karma por colaboración por encima de `floor`
+
+
+# Tabla de tiers por colaboraciones completadas. Al cambiarla, los perfiles
+# se recalculan al arrancar (job "recompute_creator_tiers", ver app.main)
+TIER_RULES = (
+    TierRule(0, 0, 0, 0, 0),
+    TierRule(1, 0, 3, 0, 100),        # 1-3
+    TierRule(2, 3, 10, 300, 50),      # 4-10
+    TierRule(3, 10, 25, 650, 30),     # 11-25
+    TierRule(4, 25, 50, 1100, 20),    # 26-50
+    TierRule(5, 50, None, 2000, 10),  # 51+
+)
+
+_CEILINGS = [rule.ceiling for rule in TIER_RULES[:-1]]
+
+
+def tier_for(completed: int) -> dict:
+    """tier_level, karma_score y tier_progress para `completed` colaboraciones"""
+    rule = TIER_RULES[bisect_left(_CEILINGS, max(completed, 0))]
+    if rule.ceiling is None:
+        progress = 100.0
+    elif rule.ceiling == rule.floor:
+        progress = 0.0
+    else:
+        progress = (completed - rule.floor) * (100.0 / (rule.ceiling - rule.floor))
+    return {
+        "tier_level": rule.tier,
+        "karma_score": rule.karma_base + (completed - rule.floor) * rule.karma_step,
+        "tier_progress": progress,
+    }
+
+
+def tier_columns(completed) -> dict:
+    """Lo mismo que `tier_for` como expresiones SQL sobre la columna/expresión `completed`"""
+    tiers, karma, progress = [], [], []
+    for rule in TIER_RULES[:-1]:
+        applies = completed <= rule.ceiling
+        tiers.append((applies, rule.tier))
+        karma.append((applies, rule.karma_base + (completed - rule.floor) * rule.karma_step))
+        if rule.ceiling == rule.floor:
+            progress.append((applies, literal(0.0, Float)))
+        else:
+            progress.append((applies, (completed - rule.floor) * literal(100.0 / (rule.ceiling - rule.floor), Float)))
+
+    last = TIER_RULES[-1]
+    return {
+        "tier_level": case(*tiers, else_=last.tier),
+        "karma_score": case(*karma, else_=last.karma_base + (completed - last.floor) * last.karma_step),
+        "tier_progress": case(*progress, else_=literal(100.0, Float)),
+    }
+
+
+class TierService:
+    """
+    Tier, karma y progreso de los creadores
+
+    Se derivan sólo de `Profile.completed_collaborations` mediante TIER_RULES,
+    así que completar una colaboración es incrementar ese contador (con la
+    fila bloqueada) y buscar el tramo en la tabla, sin contar colaboraciones.
+    """
+
+    @staticmethod
+    async def record_completion(db: AsyncSession, creator_id: int) -> Optional[Tuple[int, int]]:
+        """
+        Sumar una colaboración completada al creador y recalcular su tier
+
+        No hace commit. Devuelve (tier anterior, tier nuevo), o None si el
+        creador no tiene perfil.
+        """
+        # El bloqueo serializa completados simultáneos del mismo creador
+        profile = (await db.execute(
+            select(Profile.id, Profile.tier_level, Profile.completed_collaborations)
+            .where(Profile.user_id == creator_id)
+            .with_for_update()
+        )).first()
+        if profile is None:
+            return None
+
+        completed = (profile.completed_collaborations or 0) + 1
+        values = tier_for(completed)
+        await db.execute(
+            update(Profile)
+            .where(Profile.id == profile.id)
+            .values(completed_collaborations=completed, **values)
+            .execution_options(synchronize_session=False)
+        )
+        return profile.tier_level or 0, values["tier_level"]
+
+    @staticmethod
+    async def recompute_tiers(db: AsyncSession, recount: bool = False) -> int:
+        """
+        Recalcular tier, karma y progreso de todos los perfiles
+
+        Un único UPDATE set-based que sólo escribe los perfiles cuyo valor
+        cambia (tras modificar TIER_RULES). Con `recount=True` antes se
+        reconstruye completed_collaborations desde `collaborations` con un
+        GROUP BY. No notifica ascensos: un cambio de reglas no es un logro.
+        Devuelve el número de perfiles actualizados.
+        """
+        if recount:
+            counts = (
+                select(Collaboration.creator_id, func.count().label("completed"))
+                .where(Collaboration.status == CollaborationStatus.COMPLETED)
+                .group_by(Collaboration.creator_id)
+                .subquery()
+            )
+            await db.execute(
+                update(Profile)
+                .where(
+                    Profile.user_id == counts.c.creator_id,
+                    Profile.completed_collaborations.is_distinct_from(counts.c.completed)
+                )
+                .values(completed_collaborations=counts.c.completed)
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                update(Profile)
+                .where(
+                    Profile.completed_collaborations.is_distinct_from(0),
+                    ~select(Collaboration.id).where(
+                        Collaboration.creator_id == Profile.user_id,
+                        Collaboration.status == CollaborationStatus.COMPLETED
+                    ).exists()
+                )
+                .values(completed_collaborations=0)
+                .execution_options(synchronize_session=False)
+            )
+
+        completed = func.coalesce(Profile.completed_collaborations, 0)
+        columns = tier_columns(completed)
+        result = await db.execute(
+            update(Profile)
+            .where(or_(
+                Profile.tier_level.is_distinct_from(columns["tier_level"]),
+                Profile.karma_score.is_distinct_from(columns["karma_score"]),
+                Profile.tier_progress.is_distinct_from(columns["tier_progress"]),
+            ))
+            .values(**columns)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
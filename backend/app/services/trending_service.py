@@ -0,0 +1,125 @@
+"""Trending score service"""
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import case, func, update, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.offer import Offer, OfferStatus
+
+# Origen fijo del decaimiento temporal (no cambiar: invalida los scores guardados)
+TRENDING_EPOCH = datetime(2024, 1, 1)
+
+# Peso de cada tipo de evento
+WEIGHT_VIEW = 1.0
+WEIGHT_APPLICATION = 25.0
+WEIGHT_PUBLISH = 50.0
+
+# Por debajo de esta diferencia e^(low - high) no aporta nada en float8 y
+# Postgres (>= 12) lanza "value out of range: underflow" en exp()
+LOGADDEXP_CUTOFF = -700.0
+
+
+def _decay_rate() -> float:
+    """λ por hora a partir de la vida media configurada"""
+    return math.log(2) / settings.TRENDING_HALF_LIFE_HOURS
+
+
+def _logaddexp(a: float, b: float) -> float:
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+class TrendingService:
+    """
+    `Offer.trending_score` con decaimiento exponencial "forward decay"
+
+    El score es log(Σ peso · e^(λ·t)) con t en horas desde TRENDING_EPOCH.
+    Ordenar por este valor equivale a ordenar por popularidad con vida media
+    TRENDING_HALF_LIFE_HOURS, pero un evento nuevo sólo suma un término al
+    score de su oferta: no hace falta reescalar los scores de las demás.
+    Trabajar en escala logarítmica evita el desbordamiento de e^(λ·t).
+    """
+
+    # offer_id -> término logarítmico acumulado pendiente de volcar
+    _pending: Dict[int, float] = defaultdict(lambda: -math.inf)
+
+    @staticmethod
+    def event_term(weight: float, at: datetime = None) -> float:
+        """Término logarítmico de `weight` eventos ocurridos en `at`"""
+        hours = ((at or datetime.utcnow()) - TRENDING_EPOCH).total_seconds() / 3600
+        return math.log(weight) + _decay_rate() * hours
+
+    @staticmethod
+    def accumulate(column, term):
+        """
+        Expresión SQL: log(e^column + e^term), tratando NULL como "sin eventos"
+
+        Si el término menor queda a más de LOGADDEXP_CUTOFF del mayor se
+        descarta en lugar de evaluar exp(), que fallaría por underflow.
+        """
+        high = func.greatest(column, term)
+        low = func.least(column, term)
+        return case(
+            (column.is_(None), term),
+            (low - high < LOGADDEXP_CUTOFF, high),
+            else_=high + func.ln(1 + func.exp(low - high))
+        )
+
+    @classmethod
+    def record(cls, offer_id: int, weight: float):
+        """Registrar un evento (se vuelca con las vistas en el próximo flush)"""
+        cls._pending[offer_id] = _logaddexp(cls._pending[offer_id], cls.event_term(weight))
+
+    @classmethod
+    def drain(cls) -> Dict[int, float]:
+        """Extraer los términos pendientes"""
+        pending, cls._pending = cls._pending, defaultdict(lambda: -math.inf)
+        return dict(pending)
+
+    @classmethod
+    def restore(cls, terms: Dict[int, float]):
+        """Devolver términos al buffer si el flush falla"""
+        for offer_id, term in terms.items():
+            cls._pending[offer_id] = _logaddexp(cls._pending[offer_id], term)
+
+    @staticmethod
+    def merge_views(views: Dict[int, int], terms: Dict[int, float]) -> Dict[int, float]:
+        """Combinar deltas de vistas con los términos pendientes de cada oferta"""
+        merged = dict(terms)
+        now = datetime.utcnow()
+        for offer_id, delta in views.items():
+            term = TrendingService.event_term(WEIGHT_VIEW * delta, now)
+            merged[offer_id] = _logaddexp(merged.get(offer_id, -math.inf), term)
+        return merged
+
+    @staticmethod
+    async def backfill(db: AsyncSession) -> int:
+        """
+        Calcular el score de ofertas activas que aún no tienen uno
+
+        Los eventos históricos no tienen fecha, así que vistas y aplicaciones
+        se atribuyen al momento de publicación.
+        """
+        hours = func.extract(
+            "epoch", func.coalesce(Offer.published_at, Offer.created_at) - TRENDING_EPOCH
+        ) / 3600
+        weight = (
+            WEIGHT_PUBLISH
+            + WEIGHT_VIEW * func.coalesce(Offer.views_count, 0)
+            + WEIGHT_APPLICATION * func.coalesce(Offer.applications_count, 0)
+        )
+        result = await db.execute(
+            update(Offer)
+            .where(and_(Offer.trending_score.is_(None), Offer.status == OfferStatus.ACTIVE))
+            .values(
+                trending_score=func.ln(weight) + _decay_rate() * hours,
+                updated_at=Offer.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
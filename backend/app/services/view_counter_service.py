@@ -0,0 +1,98 @@
+"""Write-behind view counter service"""
+import asyncio
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import update, bindparam, Float, Integer
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.offer import Offer
+from app.services.trending_service import TrendingService
+
+
+class ViewCounterService:
+    """
+    Acumula vistas de ofertas en memoria y las vuelca a `Offer.views_count`
+    en UPDATEs por lotes desde una tarea en segundo plano, para que los GET
+    no abran transacciones de escritura. En el mismo UPDATE se suman las
+    vistas y los eventos pendientes de TrendingService a `trending_score`.
+    """
+
+    _pending: Counter = Counter()
+    _lock = asyncio.Lock()
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def record_views(cls, offer_ids: Iterable[int]):
+        """Registrar vistas (O(1) por oferta, sin tocar la base de datos)"""
+        cls._pending.update(offer_ids)
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Volcar las vistas acumuladas; devuelve cuántas ofertas se actualizaron"""
+        async with cls._lock:
+            views, cls._pending = cls._pending, Counter()
+            events = TrendingService.drain()
+            terms = TrendingService.merge_views(views, events)
+            if not terms:
+                return 0
+
+            offers = Offer.__table__
+            stmt = (
+                update(offers)
+                .where(offers.c.id == bindparam("offer_id"))
+                .values(
+                    views_count=offers.c.views_count + bindparam("delta", type_=Integer),
+                    trending_score=TrendingService.accumulate(
+                        offers.c.trending_score, bindparam("term", type_=Float)
+                    ),
+                    # Las vistas no son una modificación de la oferta
+                    updated_at=offers.c.updated_at,
+                )
+            )
+            params = [
+                {"offer_id": offer_id, "delta": views.get(offer_id, 0), "term": term}
+                for offer_id, term in terms.items()
+            ]
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(stmt, params)
+                    await db.commit()
+            except Exception:
+                # Devolver vistas y eventos al buffer para reintentar en el próximo ciclo
+                cls._pending.update(views)
+                TrendingService.restore(events)
+                raise
+
+            return len(params)
+
+    @classmethod
+    async def _run(cls, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await cls.flush()
+            except Exception as e:
+                print(f"Warning: Could not flush offer views: {e}")
+
+    @classmethod
+    def start(cls, interval: float = None):
+        """Arrancar el volcado periódico (llamar desde el lifespan)"""
+        if cls._task is None:
+            cls._task = asyncio.create_task(
+                cls._run(interval or settings.VIEWS_FLUSH_INTERVAL_SECONDS)
+            )
+
+    @classmethod
+    async def stop(cls):
+        """Detener el volcado periódico y vaciar el buffer pendiente"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        await cls.flush()
@@ -0,0 +1,29 @@
+"""Currency normalization for payout comparisons"""
+from typing import Optional
+
+from sqlalchemy import case, func
+
+from app.config import settings
+
+
+def base_rate(currency: Optional[str]) -> Optional[float]:
+    """Valor de una unidad de `currency` en BASE_CURRENCY (None si no hay tasa)"""
+    if not currency:
+        return None
+    return settings.CURRENCY_RATES.get(currency.upper())
+
+
+def to_base(amount: Optional[float], currency: Optional[str]) -> Optional[float]:
+    rate = base_rate(currency)
+    if amount is None or rate is None:
+        return None
+    return amount * rate
+
+
+def base_rate_sql(currency_col):
+    """CASE SQL con la tasa de cada moneda configurada (NULL si no hay tasa)"""
+    return case(
+        {code: rate for code, rate in settings.CURRENCY_RATES.items()},
+        value=func.upper(currency_col),
+        else_=None
+    )
@@ -0,0 +1,119 @@
+"""Geohash encoding and radius search helpers (sin PostGIS)"""
+import math
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, func
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Precisión con la que se guarda el geohash (~4.8 m x 4.8 m)
+GEOHASH_PRECISION = 9
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash estándar de `precision` caracteres"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # los bits pares son de longitud
+
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size_deg(precision: int) -> Tuple[float, float]:
+    """(alto, ancho) en grados de una celda de `precision` caracteres"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def cover_prefixes(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """
+    Prefijos de geohash cuya unión contiene el círculo de `radius_km`
+
+    Se usa la precisión más fina cuyas celdas miden al menos `radius_km` en
+    ambos ejes; así el círculo cae siempre dentro de la celda central y sus
+    8 vecinas. Cada prefijo es un rango contiguo en un índice B-tree.
+    """
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size_deg(candidate)
+        height_km = height * 110.574
+        width_km = width * 111.320 * math.cos(math.radians(min(abs(latitude) + height, 90.0)))
+        if height_km >= radius_km and width_km >= radius_km:
+            precision = candidate
+            break
+
+    height, width = cell_size_deg(precision)
+    prefixes = set()
+    for d_lat in (-height, 0.0, height):
+        lat = latitude + d_lat
+        if lat > 90.0 or lat < -90.0:
+            continue
+        for d_lon in (-width, 0.0, width):
+            lon = (longitude + d_lon + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(lat, lon, precision))
+    return sorted(prefixes)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia de gran círculo en kilómetros"""
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = (math.sin(d_lat / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def distance_km(lat_col, lon_col, latitude: float, longitude: float):
+    """Expresión SQL de la distancia haversine a (latitude, longitude)"""
+    a = (
+        func.power(func.sin(func.radians(lat_col - latitude) / 2), 2)
+        + math.cos(math.radians(latitude)) * func.cos(func.radians(lat_col))
+        * func.power(func.sin(func.radians(lon_col - longitude) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+def geohash_cover(geohash_col, latitude: float, longitude: float, radius_km: float):
+    """Condición WHERE de las celdas que cubren el círculo (`LIKE 'prefijo%'`)"""
+    return or_(*(geohash_col.startswith(prefix) for prefix in cover_prefixes(latitude, longitude, radius_km)))
+
+
+def within_radius(geohash_col, lat_col, lon_col, latitude: float, longitude: float, radius_km: float):
+    """
+    Condición WHERE de las filas a menos de `radius_km`
+
+    Los prefijos de geohash (`LIKE 'prefijo%'`, resuelto con el índice
+    B-tree) reducen los candidatos a unas pocas celdas; la distancia exacta
+    descarta las esquinas que quedan fuera del círculo.
+    """
+    return and_(
+        geohash_cover(geohash_col, latitude, longitude, radius_km),
+        distance_km(lat_col, lon_col, latitude, longitude) <= radius_km
+    )
+
+
+def geohash_or_none(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
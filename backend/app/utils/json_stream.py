@@ -0,0 +1,94 @@
+"""Incremental parsing of JSON arrays / NDJSON request bodies"""
+import codecs
+import json
+from typing import Any, AsyncIterator, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+_decoder = json.JSONDecoder()
+
+
+async def iter_json_values(
+    chunks: AsyncIterator[bytes],
+    max_item_bytes: int = 1_000_000
+) -> AsyncIterator[Tuple[Optional[Any], Optional[str]]]:
+    """
+    Recorrer los elementos de un cuerpo JSON a medida que llega
+
+    Acepta un array JSON (`[{...}, {...}]`) o NDJSON (un valor por línea).
+    Produce `(valor, None)` por cada elemento o `(None, error)` si no se
+    puede decodificar. En NDJSON una línea inválida se salta y se sigue con
+    la siguiente; en un array no hay forma segura de resincronizar, así que
+    el primer error termina la lectura.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    is_array = None
+    finished = False
+    exhausted = False
+    iterator = chunks.__aiter__()
+
+    async def read_more() -> bool:
+        nonlocal buffer, position, exhausted
+        if exhausted:
+            return False
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            exhausted = True
+            buffer = buffer[position:] + decoder.decode(b"", final=True)
+            position = 0
+            return False
+        buffer = buffer[position:] + decoder.decode(chunk)
+        position = 0
+        return True
+
+    while not finished:
+        # Saltar separadores entre elementos
+        while True:
+            while position < len(buffer) and (buffer[position] in _WHITESPACE or (is_array and buffer[position] == ",")):
+                position += 1
+            if position < len(buffer) or not await read_more():
+                break
+
+        if position >= len(buffer):
+            if is_array:
+                yield None, "Array JSON sin cerrar"
+            return
+
+        if is_array is None:
+            is_array = buffer[position] == "["
+            if is_array:
+                position += 1
+                continue
+
+        if is_array and buffer[position] == "]":
+            return
+
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                line_end = buffer.find("\n", position)
+                if not is_array and line_end != -1:
+                    # Línea NDJSON completa pero inválida: se descarta
+                    yield None, f"JSON inválido: {e.msg}"
+                    position = line_end + 1
+                    break
+                if len(buffer) - position > max_item_bytes:
+                    yield None, "Elemento demasiado grande"
+                    return
+                if await read_more():
+                    continue
+                yield None, f"JSON inválido: {e.msg}"
+                finished = True
+                break
+            else:
+                # Un número al final del buffer podría continuar en el siguiente chunk
+                if end == len(buffer) and not exhausted and not isinstance(value, (dict, list)):
+                    if await read_more():
+                        continue
+                position = end
+                yield value, None
+                break
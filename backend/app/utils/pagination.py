@@ -0,0 +1,97 @@
+"""Cursor (keyset) pagination helpers"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(data: dict) -> str:
+    """Codificar un cursor opaco (base64 url-safe de JSON)"""
+    def _default(value: Any):
+        if isinstance(value, datetime):
+            return {"$dt": value.isoformat()}
+        raise TypeError(f"Tipo no serializable en cursor: {type(value)}")
+
+    raw = json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+# Tipos de clave de keyset admitidos en un cursor (JSON no distingue 3 de 3.0)
+NUMBER = (int, float)
+
+
+def decode_cursor(cursor: str, key_type, nullable: bool = False, **expected) -> dict:
+    """
+    Decodificar un cursor opaco y validar su forma
+
+    Responde 400 si está malformado, si `id` no es un entero, si `k` no es
+    de `key_type` (un tipo o una tupla; None sólo con `nullable=True`) o si
+    algún campo de `expected` (p. ej. `s=sort_by`) no coincide con el de la
+    petición. Así las consultas nunca reciben un cursor manipulado.
+    """
+    def _hook(obj: dict):
+        if set(obj) == {"$dt"}:
+            return datetime.fromisoformat(obj["$dt"])
+        return obj
+
+    def _is(value, types) -> bool:
+        # bool es subclase de int, pero nunca es un id ni una clave válida
+        return isinstance(value, types) and not isinstance(value, bool)
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")), object_hook=_hook)
+    except (ValueError, TypeError):
+        data = None
+
+    valid = isinstance(data, dict) and _is(data.get("id"), int)
+    if valid:
+        key = data.get("k")
+        valid = _is(key, key_type) or (nullable and key is None)
+    if valid:
+        valid = all(data.get(field) == value for field, value in expected.items())
+
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+    return data
+
+
+def keyset_order(sort_col, id_col, descending: bool = True):
+    """ORDER BY (sort_col, id) estable; los NULL van siempre al final"""
+    if descending:
+        return (sort_col.desc().nulls_last(), id_col.desc())
+    return (sort_col.asc().nulls_last(), id_col.asc())
+
+
+def keyset_condition(
+    sort_col,
+    sort_value: Optional[Any],
+    id_col,
+    id_value: int,
+    descending: bool = True,
+    nullable: bool = False
+):
+    """
+    Condición WHERE para saltar directamente a las filas posteriores al cursor
+
+    Equivale a `(sort_col, id) < (sort_value, id_value)` (o `>` si es ascendente),
+    respetando el orden NULLS LAST de `keyset_order`.
+    """
+    id_after = id_col < id_value if descending else id_col > id_value
+
+    if sort_value is None:
+        # El cursor ya está en la zona de NULLs: sólo queda desempatar por id
+        return and_(sort_col.is_(None), id_after)
+
+    sort_after = sort_col < sort_value if descending else sort_col > sort_value
+    condition = or_(sort_after, and_(sort_col == sort_value, id_after))
+
+    if nullable:
+        condition = or_(condition, sort_col.is_(None))
+    return condition
@@ -0,0 +1,20 @@
+"""Column projection helpers for list endpoints"""
+from typing import List, Type
+
+from pydantic import BaseModel
+
+
+def schema_columns(model, schema: Type[BaseModel], exclude: tuple = ()) -> List:
+    """
+    Columnas de `model` que aparecen en el schema de respuesta
+
+    Seleccionar sólo estas columnas (`select(*columns)`) devuelve filas
+    `Row` con acceso por atributo, que FastAPI valida igual que una entidad
+    ORM pero sin identity map, eventos de carga ni relaciones.
+    """
+    table_columns = model.__table__.c
+    return [
+        getattr(model, name)
+        for name in schema.model_fields
+        if name in table_columns and name not in exclude
+    ]
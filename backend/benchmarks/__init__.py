@@ -0,0 +1 @@
+"""Benchmarks contra una base de datos Postgres real (ver README de cada script)"""
@@ -0,0 +1,206 @@
+"""
+Prueba de planes y benchmark: listado de colaboraciones por rol
+
+Siembra --collaborations colaboraciones repartidas entre --creators
+creadores y --businesses empresas y, para el creador y la empresa con más
+colaboraciones, ejecuta EXPLAIN (FORMAT JSON) de la consulta exacta que
+emite GET /collaborations (CollaborationService.collaborations_query) para
+role=creator, business y all, con y sin include_offer, en la primera
+página y en la siguiente (con cursor).
+
+Para que el resultado no dependa del tamaño de la siembra, el EXPLAIN se
+hace con enable_seqscan / enable_bitmapscan / enable_sort desactivados:
+cada rama debe resolverse como `Limit -> Index [Only] Scan` sobre su
+índice compuesto, es decir, el índice da el orden del keyset sin ordenar
+filas. Si alguna no lo hace el script termina con error, así que con la
+siembra por defecto sirve como comprobación en CI. Después se compara el
+tiempo de la primera página con el listado anterior con OR (con el
+planificador normal).
+
+La consulta de ofertas de include_offer (SELECT ... WHERE id IN, por
+clave primaria) no pasa por estos índices y no se comprueba.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+
+    python -m benchmarks.collaboration_listing
+    python -m benchmarks.collaboration_listing --collaborations 500000 --creators 20000 --businesses 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, delete, text, or_, desc, func
+
+from app.database import AsyncSessionLocal
+from app.models import User, UserType
+from app.models.collaboration import Collaboration, CollaborationStatus
+from app.models.offer import Offer
+from app.services.collaboration_service import CollaborationService
+from benchmarks.common import seed_offers, cleanup, timed
+
+USER_EMAIL_DOMAIN = "@collabs.benchmark.influfinder.local"
+
+# Índices que debe usar cada rama del listado
+EXPECTED_INDEXES = {
+    "creator": {"ix_collaborations_creator_created"},
+    "business": {"ix_collaborations_business_created"},
+    "all": {"ix_collaborations_creator_created", "ix_collaborations_business_created"},
+}
+
+
+async def seed_users(count: int, user_type: UserType, prefix: str) -> list:
+    async with AsyncSessionLocal() as db:
+        ids = (await db.execute(
+            insert(User).returning(User.id),
+            [
+                {"email": f"{prefix}{i}{USER_EMAIL_DOMAIN}", "user_type": user_type, "is_active": True}
+                for i in range(count)
+            ]
+        )).scalars().all()
+        await db.commit()
+    return list(ids)
+
+
+async def seed_collaborations(count: int, offer_ids: list, creators: list, businesses: list, chunk: int = 5000):
+    rng = random.Random(11)
+    now = datetime.utcnow()
+    # Distribución sesgada: unos pocos usuarios concentran muchas colaboraciones
+    creator_weights = [1 / (rank + 1) for rank in range(len(creators))]
+    business_weights = [1 / (rank + 1) for rank in range(len(businesses))]
+    async with AsyncSessionLocal() as db:
+        for start in range(0, count, chunk):
+            size = min(chunk, count - start)
+            picked_creators = rng.choices(creators, creator_weights, k=size)
+            picked_businesses = rng.choices(businesses, business_weights, k=size)
+            await db.execute(insert(Collaboration), [
+                {
+                    "offer_id": rng.choice(offer_ids),
+                    "creator_id": creator_id,
+                    "business_id": business_id,
+                    "status": rng.choice(list(CollaborationStatus)),
+                    "agreed_fee": rng.randint(20, 2000),
+                    "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                }
+                for creator_id, business_id in zip(picked_creators, picked_businesses)
+            ])
+        await db.commit()
+        await db.execute(text("ANALYZE collaborations"))
+        await db.commit()
+
+
+async def cleanup_users():
+    async with AsyncSessionLocal() as db:
+        users = select(User.id).where(User.email.like(f"%{USER_EMAIL_DOMAIN}"))
+        await db.execute(delete(Collaboration).where(Collaboration.creator_id.in_(users)))
+        await db.execute(delete(User).where(User.email.like(f"%{USER_EMAIL_DOMAIN}")))
+        await db.commit()
+
+
+def legacy_query(user_id: int, limit: int):
+    return (
+        select(Collaboration.id, Collaboration.created_at)
+        .where(or_(Collaboration.creator_id == user_id, Collaboration.business_id == user_id))
+        .order_by(desc(Collaboration.created_at))
+        .limit(limit + 1)
+    )
+
+
+def ordered_indexes(plan: dict) -> set:
+    """Índices de los nodos `Limit` que leen directamente de un Index [Only] Scan"""
+    found = set()
+    children = plan.get("Plans", [])
+    if plan["Node Type"] == "Limit":
+        for child in children:
+            if child["Node Type"] in ("Index Scan", "Index Only Scan"):
+                found.add(child["Index Name"])
+    for child in children:
+        found |= ordered_indexes(child)
+    return found
+
+
+async def explain(db, query) -> dict:
+    """Plan de `query` sin seq scans, bitmap scans ni sorts (si hay alternativa)"""
+    compiled = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    async with db.begin():
+        for setting in ("enable_seqscan", "enable_bitmapscan", "enable_sort"):
+            await db.execute(text(f"SET LOCAL {setting} = off"))
+        raw = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+
+async def next_position(db, user_id: int, role: str, limit: int) -> dict:
+    """Cursor de la segunda página, como lo devuelve X-Next-Cursor"""
+    rows = (await db.execute(CollaborationService.collaborations_query(user_id, role, limit + 1))).all()
+    last = rows[min(limit, len(rows)) - 1]
+    return {"k": last.created_at, "id": last.id}
+
+
+async def main(collaborations: int, creators: int, businesses: int, limit: int, repeat: int, keep: bool):
+    bench_business = await seed_offers(50)
+    try:
+        async with AsyncSessionLocal() as db:
+            offer_ids = (await db.execute(select(Offer.id).where(Offer.business_id == bench_business))).scalars().all()
+        creator_ids = await seed_users(creators, UserType.CREATOR, "creator")
+        business_ids = await seed_users(businesses, UserType.BUSINESS, "business")
+        await seed_collaborations(collaborations, list(offer_ids), creator_ids, business_ids)
+
+        async with AsyncSessionLocal() as db:
+            targets = {}
+            for role, column in (("creator", Collaboration.creator_id), ("business", Collaboration.business_id)):
+                targets[role] = await db.scalar(
+                    select(column).group_by(column).order_by(func.count().desc()).limit(1)
+                )
+            targets["all"] = targets["creator"]
+            await db.commit()
+
+            failures = []
+            print(f"{'rol':>9} {'offer':>6} {'página':>7}  índices en orden")
+            for role, user_id in targets.items():
+                position = await next_position(db, user_id, role, limit)
+                await db.commit()
+                for include_offer in (False, True):
+                    for page_name, page_position in (("1", None), ("2", position)):
+                        query = CollaborationService.collaborations_query(
+                            user_id, role, limit + 1, position=page_position, include_offer=include_offer
+                        )
+                        indexes = ordered_indexes(await explain(db, query))
+                        missing = EXPECTED_INDEXES[role] - indexes
+                        if missing:
+                            failures.append(
+                                f"{role} include_offer={include_offer} página {page_name}: "
+                                f"sin Limit -> Index Scan en {', '.join(sorted(missing))}"
+                            )
+                        print(
+                            f"{role:>9} {str(include_offer):>6} {page_name:>7}  "
+                            f"{', '.join(sorted(indexes)) or '-'}"
+                        )
+
+            print(f"\n{'rol':>9} {'usuario':>8} {'nuevo':>9} {'OR':>9}")
+            for role, user_id in targets.items():
+                query = CollaborationService.collaborations_query(user_id, role, limit + 1)
+                new = await timed(lambda: db.execute(query), repeat)
+                old = await timed(lambda: db.execute(legacy_query(user_id, limit)), repeat)
+                print(f"{role:>9} {user_id:>8} {new['median_ms']:>7}ms {old['median_ms']:>7}ms")
+    finally:
+        if not keep:
+            await cleanup_users()
+            await cleanup(bench_business)
+
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--collaborations", type=int, default=5_000)
+    parser.add_argument("--creators", type=int, default=200)
+    parser.add_argument("--businesses", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="No borrar los datos sembrados")
+    args = parser.parse_args()
+    asyncio.run(main(args.collaborations, args.creators, args.businesses, args.limit, args.repeat, args.keep))
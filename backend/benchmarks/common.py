@@ -0,0 +1,105 @@
+"""Utilidades compartidas por los benchmarks"""
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, insert, text
+
+from app.database import AsyncSessionLocal, init_db
+from app.models import User, UserType
+from app.models.offer import Offer, OfferCategory, OfferStatus
+from app.utils.currency import to_base
+
+BENCH_EMAIL = "benchmark@influfinder.local"
+
+WORDS = (
+    "viaje playa hotel restaurante comida gimnasio moda belleza maquillaje "
+    "tecnologia videojuegos musica concierto yoga running cafe brunch vino "
+    "travel beach hotel food fitness fashion beauty makeup tech gaming music "
+    "review unboxing reel story tiktok instagram launch campaign summer winter"
+).split()
+
+PLATFORMS = ["instagram", "tiktok", "youtube", "facebook"]
+
+
+async def get_bench_business(db) -> int:
+    """Usuario business dedicado a los datos del benchmark"""
+    user_id = await db.scalar(select(User.id).where(User.email == BENCH_EMAIL))
+    if user_id is None:
+        user = User(email=BENCH_EMAIL, username="benchmark", user_type=UserType.BUSINESS, is_active=True)
+        db.add(user)
+        await db.flush()
+        user_id = user.id
+    return user_id
+
+
+def fake_offer_row(business_id: int, rng: random.Random) -> dict:
+    """Fila de oferta activa con texto y metadatos aleatorios"""
+    now = datetime.utcnow()
+    budget_min = rng.randint(20, 2000)
+    budget_max = budget_min + rng.randint(0, 500) if rng.random() < 0.6 else None
+    currency = rng.choice(["USD", "USD", "EUR", "MXN", "CLP"])
+    return {
+        "business_id": business_id,
+        "title": " ".join(rng.choices(WORDS, k=6)),
+        "description": " ".join(rng.choices(WORDS, k=rng.randint(40, 120))),
+        "category": rng.choice(list(OfferCategory)),
+        "budget_min": budget_min,
+        "budget_max": budget_max,
+        "currency": currency,
+        "payout_base": to_base(budget_max if budget_max is not None else budget_min, currency),
+        "payment_terms": "upon_completion",
+        "requirements": {"influencer": {"min_followers": 10000}, "regular": {"min_followers": 100}},
+        "content_specs": {"formats": ["reel"]},
+        "deliverables": {},
+        "application_deadline": now + timedelta(days=rng.randint(1, 60)),
+        "content_deadline": now + timedelta(days=90),
+        "platforms": rng.sample(PLATFORMS, k=rng.randint(1, 3)),
+        "status": OfferStatus.ACTIVE,
+        "is_public": True,
+        "views_count": rng.randint(0, 5000),
+        "applications_count": 0,
+        "accepted_count": 0,
+        "created_at": now,
+        "updated_at": now,
+        "published_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+    }
+
+
+async def seed_offers(count: int, seed: int = 42, chunk: int = 5000) -> int:
+    """Insertar `count` ofertas del benchmark; devuelve el business_id"""
+    await init_db()
+    rng = random.Random(seed)
+    async with AsyncSessionLocal() as db:
+        business_id = await get_bench_business(db)
+        for start in range(0, count, chunk):
+            rows = [fake_offer_row(business_id, rng) for _ in range(min(chunk, count - start))]
+            await db.execute(insert(Offer), rows)
+        await db.commit()
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("ANALYZE offers"))
+        await db.commit()
+    return business_id
+
+
+async def cleanup(business_id: int):
+    """Borrar las ofertas y el usuario del benchmark"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Offer).where(Offer.business_id == business_id))
+        await db.execute(delete(User).where(User.id == business_id))
+        await db.commit()
+
+
+async def timed(fn, repeat: int = 20) -> dict:
+    """Ejecutar `fn` varias veces y devolver mediana / p95 en milisegundos"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 2),
+    }
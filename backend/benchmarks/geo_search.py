@@ -0,0 +1,165 @@
+"""
+Benchmark: búsqueda por radio con geohash (B-tree) vs haversine sobre toda la tabla
+
+Siembra ofertas y perfiles de creador repartidos por un área metropolitana
+(~60 km x 60 km alrededor de --center) y mide "ofertas cerca de mí" y
+"creadores cerca de mi local" para varios radios.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+
+    python -m benchmarks.geo_search --offers 100000 --creators 200000
+"""
+import argparse
+import asyncio
+import random
+
+from sqlalchemy import select, insert, delete, text
+
+from app.database import AsyncSessionLocal
+from app.models import User, UserType, Profile
+from app.models.offer import Offer
+from app.api.v1.offers import active_offer_filter
+from app.services.geo_service import GeoService
+from app.utils.geo import geohash_or_none
+from benchmarks.common import seed_offers, cleanup, timed
+
+RADII_KM = [1, 3, 10, 25]
+
+# Radio aproximado del área sembrada, en grados
+SPREAD_DEG = 0.27
+
+CREATOR_EMAIL_DOMAIN = "@geo.benchmark.influfinder.local"
+
+
+def random_point(rng: random.Random, center):
+    # Más densidad en el centro, como en una ciudad real
+    return (
+        center[0] + rng.gauss(0, SPREAD_DEG / 2),
+        center[1] + rng.gauss(0, SPREAD_DEG / 2),
+    )
+
+
+async def place_offers(business_id: int, center, rng: random.Random):
+    """Asignar coordenadas a las ofertas sembradas"""
+    async with AsyncSessionLocal() as db:
+        ids = (await db.execute(select(Offer.id).where(Offer.business_id == business_id))).scalars().all()
+        rows = []
+        for offer_id in ids:
+            latitude, longitude = random_point(rng, center)
+            rows.append({
+                "offer_id": offer_id,
+                "latitude": latitude,
+                "longitude": longitude,
+                "geohash": geohash_or_none(latitude, longitude),
+            })
+        await db.execute(
+            text(
+                "UPDATE offers SET latitude = :latitude, longitude = :longitude, geohash = :geohash "
+                "WHERE id = :offer_id"
+            ),
+            rows
+        )
+        await db.commit()
+
+
+async def seed_creators(count: int, center, rng: random.Random, chunk: int = 5000):
+    async with AsyncSessionLocal() as db:
+        for start in range(0, count, chunk):
+            size = min(chunk, count - start)
+            user_ids = (await db.execute(
+                insert(User).returning(User.id),
+                [
+                    {
+                        "email": f"creator{start + i}{CREATOR_EMAIL_DOMAIN}",
+                        "user_type": UserType.CREATOR,
+                        "is_active": True,
+                    }
+                    for i in range(size)
+                ]
+            )).scalars().all()
+            profiles = []
+            for user_id in user_ids:
+                latitude, longitude = random_point(rng, center)
+                profiles.append({
+                    "user_id": user_id,
+                    "instagram_followers": rng.randint(100, 200_000),
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "geohash": geohash_or_none(latitude, longitude),
+                })
+            await db.execute(insert(Profile), profiles)
+        await db.commit()
+        await db.execute(text("ANALYZE offers"))
+        await db.execute(text("ANALYZE profiles"))
+        await db.commit()
+
+
+async def cleanup_creators():
+    async with AsyncSessionLocal() as db:
+        creators = select(User.id).where(User.email.like(f"%{CREATOR_EMAIL_DOMAIN}"))
+        await db.execute(delete(Profile).where(Profile.user_id.in_(creators)))
+        await db.execute(delete(User).where(User.email.like(f"%{CREATOR_EMAIL_DOMAIN}")))
+        await db.commit()
+
+
+def offers_geohash(center, radius_km: float, limit: int):
+    distance = GeoService.offer_distance(*center)
+    return (
+        select(Offer.id, distance.label("distance_km"))
+        .where(active_offer_filter(), GeoService.offers_within(*center, radius_km))
+        .order_by(distance, Offer.id)
+        .limit(limit)
+    )
+
+
+def offers_full_scan(center, radius_km: float, limit: int):
+    distance = GeoService.offer_distance(*center)
+    return (
+        select(Offer.id, distance.label("distance_km"))
+        .where(active_offer_filter(), distance <= radius_km)
+        .order_by(distance, Offer.id)
+        .limit(limit)
+    )
+
+
+def creators_geohash(center, radius_km: float, limit: int):
+    return (
+        GeoService.nearby_creators_query(*center, radius_km)
+        .order_by(GeoService.profile_distance(*center), Profile.id)
+        .limit(limit)
+    )
+
+
+async def main(offers: int, creators: int, center, repeat: int, limit: int, keep: bool):
+    rng = random.Random(7)
+    business_id = await seed_offers(offers)
+    try:
+        await place_offers(business_id, center, rng)
+        await seed_creators(creators, center, rng)
+
+        print(f"{'radio':>6} {'ofertas geohash':>16} {'ofertas scan':>13} {'creadores geohash':>18}")
+        async with AsyncSessionLocal() as db:
+            for radius_km in RADII_KM:
+                by_geohash = await timed(lambda: db.execute(offers_geohash(center, radius_km, limit)), repeat)
+                by_scan = await timed(lambda: db.execute(offers_full_scan(center, radius_km, limit)), repeat)
+                by_creator = await timed(lambda: db.execute(creators_geohash(center, radius_km, limit)), repeat)
+                print(
+                    f"{radius_km:>4}km {by_geohash['median_ms']:>14}ms {by_scan['median_ms']:>11}ms "
+                    f"{by_creator['median_ms']:>16}ms"
+                )
+    finally:
+        if not keep:
+            await cleanup_creators()
+            await cleanup(business_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--offers", type=int, default=100_000)
+    parser.add_argument("--creators", type=int, default=200_000)
+    parser.add_argument("--center", type=float, nargs=2, default=[-33.45, -70.66], metavar=("LAT", "LON"))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="No borrar los datos sembrados")
+    args = parser.parse_args()
+    asyncio.run(main(args.offers, args.creators, tuple(args.center), args.repeat, args.limit, args.keep))
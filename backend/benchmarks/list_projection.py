@@ -0,0 +1,77 @@
+"""
+Benchmark: listado de ofertas con entidades ORM completas vs proyección de columnas
+
+Compara `select(Offer)` + validación de `OfferOut` (lo que hacía el listado)
+con `select(*OFFER_LIST_COLUMNS)` (filas `Row` sólo con lo que devuelve la API).
+Mide filas/segundo y el pico de memoria asignada por página.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+
+    python -m benchmarks.list_projection --offers 50000 --limit 100
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.api.v1.offers import OFFER_LIST_COLUMNS, active_offer_filter
+from app.models.offer import Offer
+from app.schemas.offer import OfferOut
+from benchmarks.common import seed_offers, cleanup
+
+_adapter = TypeAdapter(List[OfferOut])
+
+
+async def fetch_page(query, limit: int, offset: int, entities: bool) -> bytes:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            query.where(active_offer_filter())
+            .order_by(Offer.published_at.desc(), Offer.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = result.scalars().all() if entities else result.all()
+        return _adapter.dump_json(_adapter.validate_python(rows, from_attributes=True))
+
+
+async def measure(label: str, query, pages: int, limit: int, entities: bool = False):
+    # Una pasada de calentamiento para no medir la compilación del statement
+    await fetch_page(query, limit, 0, entities)
+
+    peaks = []
+    start = time.perf_counter()
+    for page in range(pages):
+        tracemalloc.start()
+        await fetch_page(query, limit, page * limit, entities)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+
+    rows_per_sec = pages * limit / elapsed
+    peak_kb = max(peaks) / 1024
+    print(f"{label:<12} {rows_per_sec:>12.0f} filas/s {peak_kb:>10.1f} KB pico/página")
+
+
+async def main(offers: int, pages: int, limit: int, keep: bool):
+    business_id = await seed_offers(offers)
+    try:
+        await measure("ORM", select(Offer), pages, limit, entities=True)
+        await measure("proyección", select(*OFFER_LIST_COLUMNS), pages, limit)
+    finally:
+        if not keep:
+            await cleanup(business_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--offers", type=int, default=50_000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--keep", action="store_true", help="No borrar los datos sembrados")
+    args = parser.parse_args()
+    asyncio.run(main(args.offers, args.pages, args.limit, args.keep))
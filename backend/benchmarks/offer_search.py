@@ -0,0 +1,73 @@
+"""
+Benchmark: búsqueda de ofertas con ILIKE vs full-text (tsvector + GIN)
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+
+    python -m benchmarks.offer_search --offers 100000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select, and_, or_, func
+
+from app.database import AsyncSessionLocal
+from app.models.offer import Offer, OfferStatus
+from app.services.offer_service import OfferService
+from benchmarks.common import seed_offers, cleanup, timed
+
+TERMS = ["playa", "restaur", "fitness", "unboxing summer", "maquillaje tiktok"]
+
+
+def active_offers():
+    return select(Offer.id).where(
+        and_(Offer.status == OfferStatus.ACTIVE, Offer.is_public == True)
+    )
+
+
+def ilike_query(term: str, limit: int):
+    pattern = f"%{term}%"
+    return (
+        active_offers()
+        .where(or_(Offer.title.ilike(pattern), Offer.description.ilike(pattern)))
+        .order_by(Offer.published_at.desc())
+        .limit(limit)
+    )
+
+
+def fts_query(term: str, limit: int):
+    ts_query = OfferService.build_search_query(term)
+    rank = func.ts_rank(Offer.search_vector, ts_query)
+    return (
+        active_offers()
+        .add_columns(OfferService.search_headline(ts_query))
+        .where(Offer.search_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), Offer.id.desc())
+        .limit(limit)
+    )
+
+
+async def main(offers: int, repeat: int, limit: int, keep: bool):
+    business_id = await seed_offers(offers)
+    try:
+        print(f"{'término':<20} {'ILIKE mediana':>14} {'ILIKE p95':>10} {'FTS mediana':>12} {'FTS p95':>10}")
+        async with AsyncSessionLocal() as db:
+            for term in TERMS:
+                ilike = await timed(lambda: db.execute(ilike_query(term, limit)), repeat)
+                fts = await timed(lambda: db.execute(fts_query(term, limit)), repeat)
+                print(
+                    f"{term:<20} {ilike['median_ms']:>12}ms {ilike['p95_ms']:>8}ms "
+                    f"{fts['median_ms']:>10}ms {fts['p95_ms']:>8}ms"
+                )
+    finally:
+        if not keep:
+            await cleanup(business_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--offers", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="No borrar los datos sembrados")
+    args = parser.parse_args()
+    asyncio.run(main(args.offers, args.repeat, args.limit, args.keep))
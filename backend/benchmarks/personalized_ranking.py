@@ -0,0 +1,174 @@
+"""
+Benchmark: ranking personalizado (sort_by=for_you) vectorizado vs fila a fila
+
+Genera candidatas y creadores sintéticos en memoria (no necesita base de
+datos) y mide, por tamaño de la matriz, el tiempo de puntuar + elegir la
+página con RankingService frente a la misma fórmula evaluada en Python
+puro oferta por oferta. También comprueba que ambos devuelvan la misma página.
+
+Uso (desde backend/):
+
+    python -m benchmarks.personalized_ranking --sizes 2000 5000 20000
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.models.offer import OfferCategory
+from app.services.eligibility_service import INFLUENCER_MIN_FOLLOWERS
+from app.services.ranking_service import (
+    CandidateMatrix, CreatorFeatures, RankingService, RANKING_WEIGHTS, RANKING_FRESHNESS_HOURS
+)
+from benchmarks.common import PLATFORMS
+
+CATEGORIES = [category.value for category in OfferCategory]
+COUNTRIES = ["CL", "MX", "AR", "CO", "PE", "ES", "US"]
+
+
+def fake_candidate(offer_id: int, rng: random.Random, now: datetime):
+    budget_min = rng.randint(20, 2000)
+    influencer = rng.random() < 0.7
+    return SimpleNamespace(
+        id=offer_id,
+        category=rng.choice(list(OfferCategory)),
+        platforms=rng.sample(PLATFORMS, k=rng.randint(1, 3)),
+        req_min_followers=rng.choice([10_000, 20_000, 50_000, 100_000]) if influencer else None,
+        req_max_followers=rng.choice([None, None, 500_000]) if influencer else None,
+        req_regular_min_followers=rng.choice([None, 100, 1000, 5000]),
+        req_verified_required=rng.random() < 0.1,
+        req_country=rng.choice([None, None, None] + COUNTRIES),
+        req_categories=rng.sample(CATEGORIES, k=2) if rng.random() < 0.2 else None,
+        req_excluded_categories=rng.sample(CATEGORIES, k=1) if rng.random() < 0.1 else None,
+        budget_min=budget_min,
+        budget_max=budget_min + rng.randint(0, 500),
+        payout_base=budget_min * rng.uniform(0.5, 1.5),
+        trending_score=rng.uniform(0, 12) if rng.random() < 0.8 else None,
+        published_at=now - timedelta(hours=rng.uniform(0, 24 * 30)),
+    )
+
+
+def fake_creator(rng: random.Random, offer_ids):
+    profile = SimpleNamespace(
+        instagram_followers=rng.choice([500, 5000, 15_000, 80_000, 300_000]),
+        tiktok_followers=rng.randint(0, 50_000),
+        instagram_verified=rng.random() < 0.3,
+        tiktok_verified=False,
+        country=rng.choice(COUNTRIES),
+        categories=rng.sample(CATEGORIES, k=rng.randint(1, 3)),
+        tier_level=rng.randint(0, 5),
+    )
+    applied = [(offer_id, rng.choice(list(OfferCategory))) for offer_id in rng.sample(offer_ids, k=30)]
+    return CreatorFeatures(profile, applied)
+
+
+def python_score(row, creator: CreatorFeatures, payout_norm, trending_norm, now_ts) -> float:
+    """Misma fórmula que RankingService.score, evaluada para una sola oferta"""
+    w = RANKING_WEIGHTS
+    followers = creator.followers
+    category = getattr(row.category, "value", row.category)
+
+    if followers < INFLUENCER_MIN_FOLLOWERS:
+        eligible = row.req_regular_min_followers is not None and row.req_regular_min_followers <= followers
+    else:
+        eligible = (
+            row.req_min_followers is not None and row.req_min_followers <= followers
+            and (row.req_max_followers is None or row.req_max_followers >= followers)
+            and (row.req_country is None or row.req_country == creator.country)
+            and (creator.verified or not row.req_verified_required)
+        )
+        if eligible and creator.categories:
+            eligible = (
+                (not row.req_categories or any(c in row.req_categories for c in creator.categories))
+                and not any(c in (row.req_excluded_categories or []) for c in creator.categories)
+            )
+        elif eligible:
+            eligible = not row.req_categories
+
+    history = sum(1 for c in creator.applied_categories if c == category)
+    history = history / len(creator.applied_categories) if creator.applied_categories else 0.0
+
+    follower_fit = 0.0
+    if eligible and row.req_min_followers:
+        follower_fit = min(max(math.log10(followers / row.req_min_followers), 0.0), 1.0)
+
+    age = max((now_ts - row.published_at.timestamp()) / 3600, 0.0)
+    return (
+        w["eligible"] * eligible
+        + w["category"] * (category in creator.categories)
+        + w["history"] * history
+        + w["country"] * (row.req_country is not None and row.req_country == creator.country)
+        + w["follower_fit"] * follower_fit
+        + w["payout"] * (1 + creator.tier / 2) * payout_norm
+        + w["trending"] * trending_norm
+        + w["freshness"] * 2 ** (-age / RANKING_FRESHNESS_HOURS)
+    )
+
+
+def python_rank(rows, matrix: CandidateMatrix, creator: CreatorFeatures, limit: int, now: datetime):
+    applied = set(creator.applied_ids.tolist())
+    now_ts = now.timestamp()
+    scored = [
+        (python_score(row, creator, matrix.payout_norm[i], matrix.trending_norm[i], now_ts), row.id)
+        for i, row in enumerate(rows)
+        if row.id not in applied
+    ]
+    scored.sort(reverse=True)
+    return [offer_id for _, offer_id in scored[:limit]]
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main(sizes, creators: int, repeat: int, limit: int):
+    rng = random.Random(17)
+    now = datetime.utcnow()
+
+    print(f"{'ofertas':>8} {'matriz':>10} {'numpy':>10} {'python':>10} {'x':>6} {'misma página':>13}")
+    for size in sizes:
+        rows = [fake_candidate(offer_id, rng, now) for offer_id in range(1, size + 1)]
+        start = time.perf_counter()
+        matrix = CandidateMatrix(rows)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        profiles = [fake_creator(rng, matrix.ids.tolist()) for _ in range(creators)]
+
+        def vectorized():
+            for creator in profiles:
+                RankingService.top(matrix, RankingService.score(matrix, creator, now), 0, limit)
+
+        def per_row():
+            for creator in profiles:
+                python_rank(rows, matrix, creator, limit, now)
+
+        numpy_ms = timed(vectorized, repeat) / creators
+        python_ms = timed(per_row, max(1, repeat // 5)) / creators
+
+        same = all(
+            RankingService.top(matrix, RankingService.score(matrix, creator, now), 0, limit)[0]
+            == python_rank(rows, matrix, creator, limit, now)
+            for creator in profiles
+        )
+        print(
+            f"{size:>8} {build_ms:>8.1f}ms {numpy_ms:>8.3f}ms {python_ms:>8.3f}ms "
+            f"{python_ms / numpy_ms:>5.0f}x {'sí' if same else 'NO':>13}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 5000, 20000])
+    parser.add_argument("--creators", type=int, default=20, help="Creadores distintos por medición")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    main(args.sizes, args.creators, args.repeat, args.limit)
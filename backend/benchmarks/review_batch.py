@@ -0,0 +1,90 @@
+"""
+Benchmark: revisión en lote vs una petición por aplicación
+
+Siembra una oferta con --decisions aplicaciones por escenario y aplica
+--decisions decisiones (mitad aceptadas, mitad rechazadas):
+
+  single: CollaborationService.review_application una por una (el flujo de
+          POST /applications/{app_id}/review)
+  batch:  CollaborationService.review_applications en lotes de --batch-size
+          (POST /offers/{offer_id}/applications/review-batch)
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+
+    python -m benchmarks.review_batch --decisions 1000 --batch-size 1000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.offer import Offer
+from app.schemas.collaboration import ApplicationDecision, ApplicationDecisionStatus, ApplicationReview
+from app.services.collaboration_service import CollaborationService
+from benchmarks.common import seed_offers, cleanup
+from benchmarks.review_workflow import RoundTrips, seed_applications, cleanup_applications, unit_review
+
+
+def decision(index: int, application_id: int) -> ApplicationDecision:
+    if index % 2:
+        return ApplicationDecision(
+            application_id=application_id, status=ApplicationDecisionStatus.REJECTED, rejection_reason="benchmark"
+        )
+    return ApplicationDecision(application_id=application_id, status=ApplicationDecisionStatus.ACCEPTED)
+
+
+async def run_single(application_ids: list, business_id: int):
+    for index, application_id in enumerate(application_ids):
+        choice = decision(index, application_id)
+        review = ApplicationReview(status=choice.status, rejection_reason=choice.rejection_reason)
+        await unit_review(application_id, business_id, review)
+
+
+async def run_batch(application_ids: list, business_id: int, batch_size: int):
+    async with AsyncSessionLocal() as db:
+        offer_id, budget_min = (await db.execute(
+            select(Offer.id, Offer.budget_min).where(Offer.business_id == business_id).limit(1)
+        )).one()
+    decisions = [decision(index, application_id) for index, application_id in enumerate(application_ids)]
+    for start in range(0, len(decisions), batch_size):
+        async with AsyncSessionLocal() as db:
+            await CollaborationService.review_applications(
+                db, offer_id, business_id, budget_min, decisions[start:start + batch_size]
+            )
+
+
+async def measure(name: str, fn, count: int):
+    RoundTrips.reset()
+    start = time.perf_counter()
+    await fn()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>7} {elapsed * 1000:>10.1f}ms {count / elapsed:>12.1f} {RoundTrips.statements:>11} "
+        f"{RoundTrips.commits:>8}"
+    )
+
+
+async def main(decisions: int, batch_size: int, keep: bool):
+    business_id = await seed_offers(1)
+    try:
+        application_ids = await seed_applications(business_id, 2 * decisions)
+        RoundTrips.install()
+
+        print(f"{'modo':>7} {'total':>12} {'decisiones/s':>12} {'sentencias':>11} {'commits':>8}")
+        await measure("single", lambda: run_single(application_ids[:decisions], business_id), decisions)
+        await measure("batch", lambda: run_batch(application_ids[decisions:], business_id, batch_size), decisions)
+    finally:
+        if not keep:
+            await cleanup_applications(business_id)
+            await cleanup(business_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--decisions", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="No borrar los datos sembrados")
+    args = parser.parse_args()
+    asyncio.run(main(args.decisions, args.batch_size, args.keep))
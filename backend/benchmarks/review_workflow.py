@@ -0,0 +1,198 @@
+"""
+Benchmark: revisión de aplicaciones en una transacción vs tres commits
+
+Siembra una oferta con 2 x --reviews aplicaciones y las revisa (mitad
+aceptadas, mitad rechazadas) con --concurrency revisiones simultáneas, con:
+
+  legacy: el flujo anterior (commit del estado, commit de la colaboración,
+          commit + refresh de la notificación)
+  unit:   CollaborationService.review_application (SELECT ... FOR UPDATE y
+          un único commit)
+
+Cuenta las sentencias y commits enviados a la base de datos por revisión.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+
+    python -m benchmarks.review_workflow --reviews 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import event, select, insert, delete
+
+from app.database import AsyncSessionLocal, engine
+from app.models import User, UserType
+from app.models.collaboration import Application, ApplicationStatus, Collaboration
+from app.models.notification import Notification
+from app.models.offer import Offer
+from app.schemas.collaboration import ApplicationReview
+from app.services.collaboration_service import CollaborationService
+from app.services.notification_service import NotificationService
+from benchmarks.common import seed_offers, cleanup
+
+CREATOR_EMAIL_DOMAIN = "@review.benchmark.influfinder.local"
+
+
+class RoundTrips:
+    """Sentencias y commits enviados por el engine"""
+    statements = 0
+    commits = 0
+
+    @classmethod
+    def install(cls):
+        def on_execute(*args):
+            cls.statements += 1
+
+        def on_commit(*args):
+            cls.commits += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        event.listen(engine.sync_engine, "commit", on_commit)
+
+    @classmethod
+    def reset(cls):
+        cls.statements = cls.commits = 0
+
+
+async def seed_applications(business_id: int, count: int) -> list:
+    async with AsyncSessionLocal() as db:
+        offer_id = await db.scalar(select(Offer.id).where(Offer.business_id == business_id).limit(1))
+        creator_ids = (await db.execute(
+            insert(User).returning(User.id),
+            [
+                {"email": f"creator{i}{CREATOR_EMAIL_DOMAIN}", "user_type": UserType.CREATOR, "is_active": True}
+                for i in range(count)
+            ]
+        )).scalars().all()
+        application_ids = (await db.execute(
+            insert(Application).returning(Application.id),
+            [
+                {"offer_id": offer_id, "creator_id": creator_id, "status": ApplicationStatus.APPLIED}
+                for creator_id in creator_ids
+            ]
+        )).scalars().all()
+        await db.commit()
+    return list(application_ids)
+
+
+async def cleanup_applications(business_id: int):
+    async with AsyncSessionLocal() as db:
+        offers = select(Offer.id).where(Offer.business_id == business_id)
+        applications = select(Application.id).where(Application.offer_id.in_(offers))
+        await db.execute(delete(Notification).where(Notification.related_application_id.in_(applications)))
+        await db.execute(delete(Collaboration).where(Collaboration.offer_id.in_(offers)))
+        await db.execute(delete(Application).where(Application.offer_id.in_(offers)))
+        await db.execute(delete(User).where(User.email.like(f"%{CREATOR_EMAIL_DOMAIN}")))
+        await db.commit()
+
+
+async def legacy_review(app_id: int, business_id: int, review: ApplicationReview):
+    """Flujo anterior de POST /applications/{app_id}/review"""
+    async with AsyncSessionLocal() as db:
+        application = await db.get(Application, app_id)
+        offer = await db.get(Offer, application.offer_id)
+        if offer.business_id != business_id:
+            raise RuntimeError("business incorrecto")
+
+        was_accepted = application.status == ApplicationStatus.ACCEPTED
+        application.status = review.status
+        application.reviewed_at = application.responded_at = datetime.utcnow()
+
+        is_accepted = review.status == ApplicationStatus.ACCEPTED
+        if is_accepted != was_accepted:
+            await CollaborationService.adjust_offer_counters(db, offer.id, accepted=1 if is_accepted else -1)
+
+        if review.status == ApplicationStatus.REJECTED:
+            application.rejection_reason = review.rejection_reason
+            await db.commit()
+            await NotificationService.notify_application_rejected(db, application.creator_id, application.id)
+        else:
+            await db.commit()
+            collaboration = Collaboration(
+                offer_id=offer.id,
+                application_id=application.id,
+                creator_id=application.creator_id,
+                business_id=offer.business_id,
+                agreed_fee=application.proposed_fee or offer.budget_min
+            )
+            db.add(collaboration)
+            await db.commit()
+            await db.refresh(collaboration)
+            await NotificationService.notify_application_accepted(db, application.creator_id, application.id)
+
+
+async def unit_review(app_id: int, business_id: int, review: ApplicationReview):
+    """Flujo actual: una transacción y un commit"""
+    async with AsyncSessionLocal() as db:
+        application, owner_id, budget_min = (await db.execute(
+            select(Application, Offer.business_id, Offer.budget_min)
+            .join(Offer, Offer.id == Application.offer_id)
+            .where(Application.id == app_id)
+            .with_for_update(of=Application)
+        )).one()
+        if owner_id != business_id:
+            raise RuntimeError("business incorrecto")
+        await CollaborationService.review_application(db, application, business_id, budget_min, review)
+
+
+async def run(review_fn, application_ids: list, business_id: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(index: int, app_id: int):
+        if index % 2:
+            review = ApplicationReview(status=ApplicationStatus.REJECTED, rejection_reason="benchmark")
+        else:
+            review = ApplicationReview(status=ApplicationStatus.ACCEPTED)
+        async with semaphore:
+            start = time.perf_counter()
+            await review_fn(app_id, business_id, review)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    RoundTrips.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index, app_id) for index, app_id in enumerate(application_ids)))
+    elapsed = time.perf_counter() - start
+
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 2),
+        "reviews_per_s": round(len(application_ids) / elapsed, 1),
+        "statements": round(RoundTrips.statements / len(application_ids), 2),
+        "commits": round(RoundTrips.commits / len(application_ids), 2),
+    }
+
+
+async def main(reviews: int, concurrency: int, keep: bool):
+    business_id = await seed_offers(1)
+    try:
+        application_ids = await seed_applications(business_id, 2 * reviews)
+        RoundTrips.install()
+
+        print(f"{'flujo':>7} {'mediana':>9} {'p95':>9} {'rev/s':>8} {'sentencias':>11} {'commits':>8}")
+        for name, review_fn, ids in (
+            ("legacy", legacy_review, application_ids[:reviews]),
+            ("unit", unit_review, application_ids[reviews:]),
+        ):
+            stats = await run(review_fn, ids, business_id, concurrency)
+            print(
+                f"{name:>7} {stats['median_ms']:>7}ms {stats['p95_ms']:>7}ms {stats['reviews_per_s']:>8} "
+                f"{stats['statements']:>11} {stats['commits']:>8}"
+            )
+    finally:
+        if not keep:
+            await cleanup_applications(business_id)
+            await cleanup(business_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="No borrar los datos sembrados")
+    args = parser.parse_args()
+    asyncio.run(main(args.reviews, args.concurrency, args.keep))